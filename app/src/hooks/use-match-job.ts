@@ -66,6 +66,8 @@ interface TopMatch {
     details: MatchDetails
     recommendation: string
     resume_data: ResumeData
+    // Present for the first enrich_top matches (null when the profile could not be fetched)
+    profile?: Record<string, unknown> | null
 }
 
 interface Statistics {
@@ -91,26 +93,153 @@ interface MatchJobRequest {
         }>
     }
     job_description: string
+    top_k?: number
+    enrich_top?: number
+    searches?: Array<{
+        jobtype?: string
+        region?: string
+        keyword?: string
+    }>
+}
+
+interface SnapshotInfo {
+    csv_file: string
+    scraped_at: string
+    age_seconds: number
+    // False when some listing pages could not be scraped
+    complete?: boolean
+    // Listing pages missing from this snapshot, per search key
+    failed_pages?: Record<string, number[]>
 }
 
 interface MatchJobResponse {
     status: string
     statistics: Statistics
     top_matches: TopMatch[]
+    result_id?: string
+    next_cursor?: string | null
     csv_file: string
+    snapshot?: SnapshotInfo
+    cached?: boolean
+    // Seconds spent per stage: corpus_seconds, scoring_seconds, ranking_seconds, enrich_seconds
+    timings?: Record<string, number>
+    // Totals of the scrape that produced this result (streaming endpoint only)
+    scrape_metrics?: Record<string, number> | null
     job_description: string
     matching_algorithm: string
 }
 
+interface MatchProgress {
+    source: "scrape" | "snapshot"
+    search: string | null
+    page: number
+    max_pages: number
+    rows: number
+}
+
+interface LeaderboardEvent {
+    page: number
+    total_resumes_scanned: number
+    statistics: Statistics
+    top_matches: TopMatch[]
+}
+
+// Split a Server-Sent Events buffer into complete frames, returning the unfinished tail
+function parseSseFrames(buffer: string): { events: Array<{ event: string; data: any }>; rest: string } {
+    const frames = buffer.split("\n\n")
+    const rest = frames.pop() ?? ""
+    const events = frames
+        .map((frame) => {
+            let event = "message"
+            const dataLines: string[] = []
+            frame.split("\n").forEach((line) => {
+                if (line.startsWith("event:")) event = line.slice(6).trim()
+                else if (line.startsWith("data:")) dataLines.push(line.slice(5).trim())
+            })
+            return dataLines.length ? { event, data: JSON.parse(dataLines.join("\n")) } : null
+        })
+        .filter((e): e is { event: string; data: any } => e !== null)
+    return { events, rest }
+}
+
 export function useMatchJob() {
     const [isLoading, setIsLoading] = useState(false)
     const [error, setError] = useState<string | null>(null)
     const [data, setData] = useState<MatchJobResponse | null>(null)
+    const [progress, setProgress] = useState<MatchProgress | null>(null)
 
     const matchJob = async (requestData: MatchJobRequest) => {
         setIsLoading(true)
         setError(null)
         setData(null)
+        setProgress(null)
+
+        try {
+            // Stream progress and intermediate leaderboards so strong candidates show up early
+            const response = await fetch(`${API_URL}/match-job/stream`, {
+                method: "POST",
+                headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
+                body: JSON.stringify(requestData),
+            })
+
+            if (!response.ok || !response.body) {
+                const body = await response.json().catch(() => null)
+                throw new Error(body?.detail || `Request failed with status ${response.status}`)
+            }
+
+            const reader = response.body.getReader()
+            const decoder = new TextDecoder()
+            let buffer = ""
+            let finalData: MatchJobResponse | null = null
+
+            while (true) {
+                const { done, value } = await reader.read()
+                if (done) break
+                buffer += decoder.decode(value, { stream: true })
+
+                const { events, rest } = parseSseFrames(buffer)
+                buffer = rest
+
+                for (const { event, data: payload } of events) {
+                    if (event === "progress") {
+                        setProgress(payload as MatchProgress)
+                    } else if (event === "leaderboard") {
+                        const board = payload as LeaderboardEvent
+                        setData((prev) => ({
+                            status: "in_progress",
+                            statistics: board.statistics,
+                            top_matches: board.top_matches,
+                            csv_file: prev?.csv_file ?? "",
+                            job_description: requestData.job_description,
+                            matching_algorithm: prev?.matching_algorithm ?? "",
+                        }))
+                    } else if (event === "done") {
+                        finalData = payload as MatchJobResponse
+                        setData(finalData)
+                    } else if (event === "error") {
+                        throw new Error(payload?.detail || "Failed to match job")
+                    }
+                }
+            }
+
+            if (!finalData) {
+                throw new Error("Match stream ended unexpectedly")
+            }
+            return finalData
+        } catch (err) {
+            const errorMessage = err instanceof Error ? err.message : "Failed to match job"
+            setError(errorMessage)
+            throw err
+        } finally {
+            setIsLoading(false)
+        }
+    }
+
+    // Non-streaming fallback: single request, full result at the end
+    const matchJobOnce = async (requestData: MatchJobRequest) => {
+        setIsLoading(true)
+        setError(null)
+        setData(null)
 
         try {
             const result = await api.post("/match-job", requestData)
@@ -129,13 +258,16 @@ export function useMatchJob() {
         setIsLoading(false)
         setError(null)
         setData(null)
+        setProgress(null)
     }
 
     return {
         matchJob,
+        matchJobOnce,
         isLoading,
         error,
         data,
+        progress,
         reset,
     }
 }
@@ -0,0 +1,95 @@
+"""
+Row extractor benchmark: pages/sec of parse_resume_rows on fixture pages
+
+    cd backend && python -m benchmarks.bench_row_parser [--pages-dir DIR] [--repeat N]
+
+Compares the single-walk extractor (lxml, and its html.parser fallback)
+with the previous per-field select_one extraction, after checking that
+all of them return the same records. Pages come from jobthai_fixtures,
+or from saved .html files in --pages-dir.
+"""
+import argparse
+import glob
+import os
+import time
+from typing import Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+from benchmarks.jobthai_fixtures import load_rows, render_pages
+from controllers import jobthai_scraper
+from controllers.jobthai_scraper import build_resume_record, parse_resume_rows
+
+
+def parse_resume_rows_select(html: str) -> List[Dict[str, str]]:
+    """The previous extractor: one select_one CSS query per field on html.parser"""
+    soup = BeautifulSoup(html, "html.parser")
+    rows = []
+    for row in soup.select("tr[id^='trBody_']"):
+        row_id = row.get("id", "")
+        resume_id = row_id.split("_")[-1] if "_" in row_id else ""
+        fields = {}
+        for fragment, column in jobthai_scraper.ROW_SPAN_FIELDS:
+            el = row.select_one(f"span[id*='{fragment}']")
+            if el is not None:
+                fields[column] = el.get_text(strip=True)
+        link = row.select_one("a[href*='/resume/']")
+        href = link["href"] if link and link.get("href") else None
+        if resume_id and resume_id not in jobthai_scraper.SKIPPED_RESUME_IDS:
+            rows.append(build_resume_record(resume_id, fields, href))
+    return rows
+
+
+def parse_resume_rows_bs4(html: str) -> List[Dict[str, str]]:
+    return [
+        build_resume_record(row_id.split("_")[-1], fields, href)
+        for row_id, fields, href in jobthai_scraper._iter_raw_rows_bs4(html)
+        if row_id.split("_")[-1] not in jobthai_scraper.SKIPPED_RESUME_IDS
+    ]
+
+
+def pages_per_second(parse: Callable[[str], List], pages: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for page in pages:
+            parse(page)
+        best = min(best, time.perf_counter() - started)
+    return len(pages) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages-dir", help="directory of saved resume_list.php .html pages")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.pages_dir:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(args.pages_dir, "*.html"))):
+            with open(path, encoding="utf-8") as f:
+                pages.append(f.read())
+    else:
+        pages = render_pages(load_rows())
+
+    parsers = {
+        "select_one (html.parser)": parse_resume_rows_select,
+        "single walk (html.parser)": parse_resume_rows_bs4,
+        "single walk (parse_resume_rows)": parse_resume_rows,
+    }
+
+    expected = [parse_resume_rows_select(page) for page in pages]
+    for name, parse in parsers.items():
+        if [parse(page) for page in pages] != expected:
+            raise SystemExit(f"{name} extracted different records")
+
+    print(f"{len(pages)} pages, {sum(len(rows) for rows in expected)} rows")
+    baseline = None
+    for name, parse in parsers.items():
+        rate = pages_per_second(parse, pages, args.repeat)
+        baseline = baseline or rate
+        print(f"{name:34s} {rate:8.1f} pages/s  ({rate / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
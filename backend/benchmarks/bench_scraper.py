@@ -0,0 +1,113 @@
+"""
+Scraper benchmark: end-to-end pages/sec and rows/sec against the local JobThai stand-in
+
+    cd backend && python -m benchmarks.bench_scraper [--pages 40] [--latency 0.1] [--error-rate 0.02] [--concurrency 1 2 4 8]
+
+Serves --pages listing pages from jobthai_standin and, for every
+--concurrency, pages through them with aiter_jobthai_pages (fetch, retry
+and parse), then runs one full scrape_jobthai_resumes_async to a temp CSV
+at the scraper's own concurrency. The rate limiter is swapped for one
+allowing --rate requests/sec so the stand-in's latency, not the politeness
+limit, is what gets measured; retry backoff starts at --retry-delay.
+The parse row is parse_resume_rows alone on the same pages, and its share
+is the part of each run's wall time spent parsing.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.bench_row_parser import pages_per_second
+from benchmarks.jobthai_standin import JobThaiStandIn
+from controllers import jobthai_scraper
+from controllers.jobthai_scraper import aiter_jobthai_pages, parse_resume_rows, scrape_jobthai_resumes_async
+from controllers.rate_limit import CircuitBreaker, TokenBucket
+
+
+async def run_pages(concurrency: int, max_pages: int, rate: float) -> Dict:
+    """Fetch and parse every listing page at the given concurrency"""
+    failures: Dict[int, str] = {}
+    pages = rows = 0
+    started = time.perf_counter()
+    async for _, page_rows in aiter_jobthai_pages(
+        "bench", "bench", "bench", max_pages,
+        concurrency=concurrency,
+        rate_limiter=TokenBucket(rate, max(concurrency, 1)),
+        circuit_breaker=CircuitBreaker(failure_threshold=max_pages + 1),
+        failures=failures
+    ):
+        pages += 1
+        rows += len(page_rows)
+    return {"seconds": time.perf_counter() - started, "pages": pages, "rows": rows, "failed": len(failures)}
+
+
+async def run_scrape(max_pages: int, rate: float) -> Dict:
+    """One full scrape (fetch, parse, dedupe, checkpointed CSV) into a temp directory"""
+    jobthai_scraper.jobthai_rate_limiter = TokenBucket(rate, jobthai_scraper.MAX_CONCURRENT_PAGES)
+    jobthai_scraper.jobthai_circuit_breaker = CircuitBreaker(failure_threshold=max_pages + 1)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        started = time.perf_counter()
+        result = await scrape_jobthai_resumes_async(
+            "bench", "bench", "bench", max_pages,
+            filename=os.path.join(tmp_dir, "jobthai_resumes.csv")
+        )
+        seconds = time.perf_counter() - started
+    failed = sum(len(pages) for pages in result.failed_pages.values())
+    return {"seconds": seconds, "pages": max_pages - failed, "rows": result.row_count, "failed": failed}
+
+
+def report(name: str, run: Dict, parse_rate: float) -> None:
+    parse_share = run["pages"] / parse_rate / run["seconds"] if run["seconds"] else 0.0
+    print(
+        f"{name:28s} {run['seconds']:7.2f}s {run['pages'] / run['seconds']:8.1f} pages/s "
+        f"{run['rows'] / run['seconds']:9.1f} rows/s  parse {parse_share:5.1%}  failed {run['failed']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.1, help="stand-in seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="stand-in probability of a 503")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--rate", type=float, default=1000.0, help="requests/sec allowed by the rate limiter")
+    parser.add_argument("--retry-delay", type=float, default=0.05, help="first retry backoff in seconds")
+    parser.add_argument("--repeat", type=int, default=3, help="repeats of the offline parse timing")
+    parser.add_argument("--verbose", action="store_true", help="show the scraper's own output")
+    args = parser.parse_args()
+
+    jobthai_scraper.RETRY_BASE_DELAY = args.retry_delay
+    standin = JobThaiStandIn(
+        pages=args.pages,
+        per_page=args.per_page,
+        latency=args.latency,
+        error_rate=args.error_rate
+    )
+    pages: List[str] = [standin.render_listing(page).decode("utf-8") for page in range(1, args.pages + 1)]
+    parse_rate = pages_per_second(parse_resume_rows, pages, args.repeat)
+
+    with standin:
+        jobthai_scraper.JOBTHAI_BASE_URL = standin.base_url
+        print(
+            f"{args.pages} pages x {args.per_page} rows from {standin.base_url}, "
+            f"{args.latency * 1000:.0f} ms latency, {args.error_rate:.0%} errors"
+        )
+        print(f"{'parse_resume_rows (offline)':28s} {'':8s} {parse_rate:8.1f} pages/s {parse_rate * args.per_page:9.1f} rows/s")
+        quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        for concurrency in args.concurrency:
+            with quiet:
+                run = asyncio.run(run_pages(concurrency, args.pages, args.rate))
+            report(f"pages, concurrency {concurrency}", run, parse_rate)
+        with quiet:
+            run = asyncio.run(run_scrape(args.pages, args.rate))
+        report(f"full scrape, concurrency {jobthai_scraper.MAX_CONCURRENT_PAGES}", run, parse_rate)
+        print(f"stand-in: {standin.stats.to_dict()}")
+
+
+if __name__ == "__main__":
+    main()
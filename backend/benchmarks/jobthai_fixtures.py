@@ -0,0 +1,64 @@
+"""
+Synthetic JobThai resume_list.php pages for offline benchmarks
+Rows from a scraped CSV are rendered back into the listing's row markup
+(tr#trBody_<id> with span ids carrying the field fragments the scraper
+dispatches on), so parsing them yields the CSV records again.
+"""
+import csv
+import html
+import os
+from typing import Dict, List
+
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "jobthai_resumes.csv")
+
+# CSV column -> span id prefix, in the order the listing shows them
+ROW_SPANS = (
+    ("คะแนน", "resumeRankingPercent"),
+    ("อายุ", "text-age"),
+    ("ตำแหน่งที่สมัคร", "positionValue"),
+    ("อัปเดตล่าสุด", "lastUpdateValue"),
+    ("จังหวัด", "addressValue"),
+    ("เงินเดือน", "salaryValue"),
+    ("ระดับการศึกษา", "grad1LevelValue"),
+    ("สาขา", "grad1FieldValue"),
+    ("มหาวิทยาลัย", "grad1SchoolValue"),
+    ("ตำแหน่งที่เคยทำ", "workExperienceValue"),
+)
+
+
+def load_rows(csv_path: str = DEFAULT_CSV) -> List[Dict[str, str]]:
+    with open(csv_path, "r", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def render_row(row: Dict[str, str]) -> str:
+    resume_id = row["เรซูเม่ ID"]
+    spans = "\n".join(
+        f'        <div class="resume-field"><span class="label">{column}</span>'
+        f'<span id="{prefix}_{resume_id}" class="value"> {html.escape(row.get(column, "-"))} </span></div>'
+        for column, prefix in ROW_SPANS
+    )
+    profile = html.escape(row.get("ลิงก์โปรไฟล์", "").replace("https://www3.jobthai.com", ""))
+    return (
+        f'  <tr id="trBody_{resume_id}" class="resume-row">\n'
+        f'    <td class="no"><span id="text-no_{resume_id}">{html.escape(row.get("ลำดับ", ""))}.</span></td>\n'
+        f'    <td class="detail">\n{spans}\n'
+        f'      <a class="profile" href="{profile}" target="_blank">ดูเรซูเม่</a>\n'
+        f'    </td>\n'
+        f'  </tr>\n'
+    )
+
+
+def render_page(rows: List[Dict[str, str]]) -> str:
+    """One listing page; an empty rows list renders the "no results" page"""
+    body = "".join(render_row(row) for row in rows) if rows else '  <tr><td class="empty">ไม่พบข้อมูล</td></tr>\n'
+    return (
+        "<!DOCTYPE html>\n<html lang=\"th\"><head><meta charset=\"utf-8\"><title>JobThai - ค้นหาเรซูเม่</title></head>\n"
+        "<body><div id=\"content\"><table id=\"resumeList\" class=\"table\">\n"
+        f"{body}"
+        "</table><div class=\"pagination\"><a href=\"?p=2\">2</a></div></div></body></html>\n"
+    )
+
+
+def render_pages(rows: List[Dict[str, str]], page_size: int = 20) -> List[str]:
+    return [render_page(rows[start:start + page_size]) for start in range(0, len(rows), page_size)]
@@ -0,0 +1,244 @@
+"""
+Local stand-in for JobThai's resume search, for offline scraper tests and benchmarks
+
+    cd backend && python -m benchmarks.jobthai_standin [--port 8765] [--pages 50] [--latency 0.2] [--error-rate 0.05]
+    JOBTHAI_BASE_URL=http://127.0.0.1:8765 uvicorn main:app
+
+Serves /findresume/resume_list.php?p=N in the listing's row markup
+(jobthai_fixtures.render_page) and /resume/0,<id>.html profile pages.
+Rows are the fixture CSV's, repeated with fresh resume IDs until `pages`
+pages of `per_page` rows are filled; pages past that render the "no
+results" page. Every search (jobtype / region / KeyWord) gets the same
+listing. Each response waits `latency` seconds (plus up to `jitter`);
+pages in fail_pages always answer 500, and any request fails with 503
+with probability error_rate. Cookies are not checked.
+"""
+import argparse
+import html
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.jobthai_fixtures import load_rows, render_page
+
+# IDs of generated rows: FIRST_RESUME_ID, FIRST_RESUME_ID + 1, ...
+FIRST_RESUME_ID = 9_000_000
+
+
+class StandInStats:
+    """Request counters, updated from the server's handler threads"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.active = 0
+        self.max_active = 0
+        self.pages: List[int] = []
+        self._lock = threading.Lock()
+
+    def to_dict(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "bytes_sent": self.bytes_sent,
+            "max_concurrent": self.max_active
+        }
+
+
+class JobThaiStandIn:
+    """
+    Threaded HTTP server imitating JobThai's listing and profile pages
+    Use as a context manager (or start() / stop()); base_url is what
+    jobthai_scraper.JOBTHAI_BASE_URL should be set to.
+    """
+
+    def __init__(
+        self,
+        pages: int = 50,
+        per_page: int = 20,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        fail_pages: Iterable[int] = (),
+        rows: Optional[List[Dict[str, str]]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = 0
+    ):
+        self.pages = pages
+        self.per_page = per_page
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fail_pages = set(fail_pages)
+        self.stats = StandInStats()
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+
+        template = rows or load_rows()
+        self._rows = [
+            dict(template[i % len(template)], **{"เรซูเม่ ID": str(FIRST_RESUME_ID + i), "ลำดับ": str(i + 1)})
+            for i in range(pages * per_page)
+        ]
+        self._rendered: Dict[int, bytes] = {}
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def page_rows(self, page: int) -> List[Dict[str, str]]:
+        if page < 1:
+            return []
+        return self._rows[(page - 1) * self.per_page:page * self.per_page]
+
+    def render_listing(self, page: int) -> bytes:
+        body = self._rendered.get(page)
+        if body is None:
+            body = render_page(self.page_rows(page)).encode("utf-8")
+            self._rendered[page] = body
+        return body
+
+    @staticmethod
+    def render_profile(resume_id: str) -> bytes:
+        return (
+            "<!DOCTYPE html>\n<html lang=\"th\"><head><meta charset=\"utf-8\"><title>JobThai - เรซูเม่</title></head>\n"
+            f"<body><div id=\"resume\"><h1>เรซูเม่ {html.escape(resume_id)}</h1>\n"
+            "<div>ตำแหน่งที่ต้องการ Programmer</div>\n"
+            "<div>เงินเดือนที่ต้องการ 25,000 บาท</div>\n"
+            "<div>ประวัติการศึกษา ปริญญาตรี สาขาวิทยาการคอมพิวเตอร์</div>\n"
+            "<div>ทักษะ Python, SQL, React, Docker</div>\n"
+            "</div></body></html>\n"
+        ).encode("utf-8")
+
+    def _should_fail(self) -> bool:
+        if not self.error_rate:
+            return False
+        with self._random_lock:
+            return self._random.random() < self.error_rate
+
+    def _delay(self) -> float:
+        if not self.jitter:
+            return self.latency
+        with self._random_lock:
+            return self.latency + self._random.uniform(0, self.jitter)
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                stats = standin.stats
+                with stats._lock:
+                    stats.requests += 1
+                    stats.active += 1
+                    stats.max_active = max(stats.max_active, stats.active)
+                try:
+                    time.sleep(standin._delay())
+                    status, body = self._respond()
+                finally:
+                    with stats._lock:
+                        stats.active -= 1
+
+                with stats._lock:
+                    stats.bytes_sent += len(body)
+                    if status != 200:
+                        stats.errors += 1
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The scraper cancelled pages fetched past the end of the listing
+                    pass
+
+            def _respond(self):
+                url = urlparse(self.path)
+                if url.path.startswith("/resume/"):
+                    if standin._should_fail():
+                        return 503, b"Service Unavailable"
+                    resume_id = url.path.rsplit(",", 1)[-1].split(".")[0]
+                    return 200, standin.render_profile(resume_id)
+
+                if url.path != "/findresume/resume_list.php":
+                    return 404, b"Not Found"
+                try:
+                    page = int(parse_qs(url.query).get("p", ["1"])[-1])
+                except ValueError:
+                    return 400, b"Bad Request"
+                with standin.stats._lock:
+                    standin.stats.pages.append(page)
+                if page in standin.fail_pages:
+                    return 500, b"Internal Server Error"
+                if standin._should_fail():
+                    return 503, b"Service Unavailable"
+                return 200, standin.render_listing(page)
+
+        return Handler
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "JobThaiStandIn":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of a 503 per request")
+    parser.add_argument("--fail-pages", type=int, nargs="*", default=[], help="pages that always answer 500")
+    args = parser.parse_args()
+
+    standin = JobThaiStandIn(
+        pages=args.pages,
+        per_page=args.per_page,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        fail_pages=args.fail_pages,
+        host=args.host,
+        port=args.port
+    )
+    print(f"JobThai stand-in: {args.pages} pages of {args.per_page} resumes at {standin.base_url}")
+    print(f"  JOBTHAI_BASE_URL={standin.base_url}")
+    try:
+        standin._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin._server.server_close()
+        print(standin.stats.to_dict())
+
+
+if __name__ == "__main__":
+    main()
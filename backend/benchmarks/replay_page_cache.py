@@ -0,0 +1,79 @@
+"""
+Offline replay: rebuild a resume CSV from the raw page cache, without contacting JobThai
+
+    cd backend && python -m benchmarks.replay_page_cache [--page-cache page_cache] [--output replay.csv] [--list]
+
+Finds every cached listing page (RawPageCache.urls) under --base-url
+(default JOBTHAI_BASE_URL), groups them into searches, and runs
+scrape_jobthai_resumes with replay=True over those searches, so the CSV
+is re-derived with the current parser from the newest cached copy of
+each page. --list only prints the cached searches and their pages.
+"""
+import argparse
+import json
+import os
+from typing import Dict, List, Set
+from urllib.parse import parse_qs, urlsplit
+
+from controllers import jobthai_scraper
+from controllers.jobthai_scraper import JOBTHAI_SEARCH_PATH, SearchQuery, is_jobthai_url, scrape_jobthai_resumes
+from controllers.page_cache import RawPageCache
+
+LISTING_PATH = urlsplit(JOBTHAI_SEARCH_PATH).path
+
+
+def cached_searches(page_cache: RawPageCache) -> Dict[SearchQuery, Set[int]]:
+    """Listing pages in the cache per search, for URLs on JOBTHAI_BASE_URL"""
+    searches: Dict[SearchQuery, Set[int]] = {}
+    for url in page_cache.urls():
+        parts = urlsplit(url)
+        if not is_jobthai_url(url) or not parts.path.endswith(LISTING_PATH):
+            continue
+        params = parse_qs(parts.query, keep_blank_values=True)
+        try:
+            page = int(params.get("p", ["1"])[-1])
+        except ValueError:
+            continue
+        query = SearchQuery(
+            jobtype=params.get("jobtype", [""])[-1],
+            region=params.get("region", [""])[-1],
+            keyword=params.get("KeyWord", [""])[-1]
+        )
+        searches.setdefault(query, set()).add(page)
+    return searches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--page-cache", default=os.path.join(os.getcwd(), "page_cache"), help="RawPageCache directory")
+    parser.add_argument("--base-url", default=jobthai_scraper.JOBTHAI_BASE_URL, help="site whose cached pages are replayed")
+    parser.add_argument("--output", default=os.path.join(os.getcwd(), "jobthai_resumes_replay.csv"))
+    parser.add_argument("--list", action="store_true", help="only list the cached searches")
+    args = parser.parse_args()
+
+    jobthai_scraper.JOBTHAI_BASE_URL = args.base_url.rstrip("/")
+    page_cache = RawPageCache(args.page_cache)
+    searches = cached_searches(page_cache)
+    if not searches:
+        print(f"No cached listing pages of {jobthai_scraper.JOBTHAI_BASE_URL} in {page_cache.root_dir}")
+        return
+
+    for query, pages in sorted(searches.items(), key=lambda item: item[0].key()):
+        print(f"{query.key():40s} {len(pages):4d} pages (max {max(pages)})")
+    if args.list:
+        return
+
+    queries: List[SearchQuery] = sorted(searches, key=lambda query: query.key())
+    result = scrape_jobthai_resumes(
+        "-", "-", "-",
+        max(max(pages) for pages in searches.values()),
+        filename=args.output,
+        page_cache=page_cache,
+        replay=True,
+        queries=queries
+    )
+    print(json.dumps(result.to_dict(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
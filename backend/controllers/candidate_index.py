@@ -0,0 +1,137 @@
+from collections import Counter
+from typing import Callable, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# Candidates whose similarity is evaluated per MaxScore step
+SCORE_BLOCK_SIZE = 256
+
+
+class CandidateIndex:
+    """
+    Inverted index over the position/experience text of one corpus
+    The TF-IDF vectorizer is fitted once per corpus (snapshot) instead of once
+    per request. Rows are L2-normalised, so a resume's similarity to the job is
+    the dot product over the job's terms only, and a resume sharing no term
+    with the job has similarity exactly 0 without being looked at.
+      postings     CSC (rows x terms) matrix: column t lists the rows containing term t
+      max_weights  largest weight of each term in any row (WAND-style bound)
+      column_sums  sum of each term's weights over all rows
+    """
+
+    def __init__(
+        self,
+        vectorizer,
+        postings: sparse.csc_matrix,
+        max_weights: Optional[np.ndarray] = None,
+        column_sums: Optional[np.ndarray] = None
+    ):
+        self.vectorizer = vectorizer
+        self.postings = postings
+        if max_weights is None:
+            max_weights = postings.max(axis=0).toarray().ravel() if postings.shape[1] else np.zeros(0)
+        if column_sums is None:
+            column_sums = np.asarray(postings.sum(axis=0)).ravel()
+        self.max_weights = max_weights
+        self.column_sums = column_sums
+
+    def __len__(self) -> int:
+        return self.postings.shape[0]
+
+    @classmethod
+    def build(cls, docs: Sequence, vectorizer) -> "CandidateIndex":
+        """Fit vectorizer on one document per row (texts, or token lists for a pretokenized vectorizer)"""
+        try:
+            matrix = vectorizer.fit_transform(docs)
+        except ValueError:
+            # Empty vocabulary (e.g. every text is blank): nothing can ever match
+            return cls(None, sparse.csc_matrix((len(docs), 0)))
+        return cls(vectorizer, matrix.tocsc())
+
+    def query_terms(self, job_doc) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vocabulary term ids of the job document and their normalised TF-IDF weights
+        The weights are L2-normalised over all of the job's terms, including
+        those no resume contains (weighted with the IDF of a term in no row),
+        so similarities are true cosines rather than cosines to the job's
+        in-vocabulary part. vectorizer.transform would drop those terms before
+        normalising and overstate every similarity.
+        """
+        if self.vectorizer is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        counts = Counter(self.vectorizer.build_analyzer()(job_doc))
+        vocabulary = self.vectorizer.vocabulary_
+        known = sorted((vocabulary[term], count) for term, count in counts.items() if term in vocabulary)
+        unknown_counts = np.array([count for term, count in counts.items() if term not in vocabulary], dtype=float)
+
+        terms = np.array([term_id for term_id, _ in known], dtype=np.int64)
+        weights = np.array([count for _, count in known], dtype=float) * self.vectorizer.idf_[terms]
+        # Smoothed IDF (the vectorizer's default) of a term with document frequency 0
+        unknown_weights = unknown_counts * (np.log(1 + len(self)) + 1)
+        norm = np.sqrt(weights @ weights + unknown_weights @ unknown_weights)
+        if norm == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        return terms, weights / norm
+
+    def query_postings(self, terms: np.ndarray) -> sparse.csr_matrix:
+        """The job terms' posting lists as a row-major (rows x job terms) matrix"""
+        return self.postings[:, terms].tocsr()
+
+    @staticmethod
+    def candidates(query_postings: sparse.csr_matrix) -> np.ndarray:
+        """Rows sharing at least one term with the job"""
+        return np.flatnonzero(np.diff(query_postings.indptr))
+
+    @staticmethod
+    def similarities(query_postings: sparse.csr_matrix, weights: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Cosine similarity to the job for the given rows (all rows if None)"""
+        if rows is not None:
+            query_postings = query_postings[rows]
+        return np.asarray(query_postings @ weights).ravel()
+
+    def similarity_bound(self, terms: np.ndarray, weights: np.ndarray) -> float:
+        """Upper bound of any row's similarity: sum of each job term's weight times its max row weight"""
+        if len(terms) == 0:
+            return 0.0
+        return min(1.0, float(self.max_weights[terms] @ weights))
+
+    def similarity_sum(self, terms: np.ndarray, weights: np.ndarray) -> float:
+        """Sum of every row's similarity, from the column sums alone"""
+        if len(terms) == 0:
+            return 0.0
+        return float(self.column_sums[terms] @ weights)
+
+
+def maxscore_top_k(
+    totals: np.ndarray,
+    candidates: np.ndarray,
+    upper_bounds: np.ndarray,
+    score_rows: Callable[[np.ndarray], np.ndarray],
+    k: int,
+    block_size: int = SCORE_BLOCK_SIZE
+) -> np.ndarray:
+    """
+    MaxScore-style pruning of candidate scoring
+    totals holds exact scores for every non-candidate row and NaN for candidates.
+    Candidates are fully scored (score_rows) in descending upper-bound order until
+    the next upper bound, rounded like the ranking, is strictly below the k-th best
+    rounded score known so far; those remaining cannot enter the top-k, even on a
+    tie. totals is filled in place; the unscored candidates are returned.
+    """
+    order = candidates[np.argsort(-upper_bounds, kind="stable")]
+    rounded_bounds = np.round(np.sort(upper_bounds)[::-1], 2)
+
+    position = 0
+    while position < len(order):
+        known = totals[~np.isnan(totals)]
+        if len(known) >= k:
+            threshold = np.partition(np.round(known, 2), len(known) - k)[len(known) - k]
+            if rounded_bounds[position] < threshold:
+                break
+
+        block = order[position:position + block_size]
+        totals[block] = score_rows(block)
+        position += len(block)
+
+    return order[position:]
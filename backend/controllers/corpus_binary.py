@@ -0,0 +1,181 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from controllers.candidate_index import CandidateIndex
+from controllers.resume_corpus import ResumeCorpus
+
+BINARY_MAGIC = b"JTCORP01"
+BINARY_SUFFIX = ".bin"
+# Every section starts on this boundary so NumPy views are aligned
+SECTION_ALIGNMENT = 8
+# Trailer: header offset and header length, both uint64 little endian
+TRAILER = struct.Struct("<QQ")
+
+
+def binary_path_for(csv_path: str) -> str:
+    """Binary snapshot stored next to a CSV snapshot"""
+    return os.path.splitext(csv_path)[0] + BINARY_SUFFIX
+
+
+def pack_strings(values: Sequence[str]) -> Tuple[np.ndarray, bytes]:
+    """UTF-8 string heap plus uint64 offsets (len + 1): value i is heap[offsets[i]:offsets[i + 1]]"""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    if encoded:
+        offsets[1:] = np.cumsum([len(value) for value in encoded])
+    return offsets, b"".join(encoded)
+
+
+class MappedRows(Sequence):
+    """
+    Read-only resume rows backed by a mapped string heap
+    Row i is decoded into a fresh dict (Thai CSV keys) only when accessed, so
+    a loaded corpus costs no per-row Python objects until rows are shown.
+    """
+
+    def __init__(self, fields: List[str], offsets: np.ndarray, heap: memoryview):
+        self.fields = fields
+        self._offsets = offsets
+        self._heap = heap
+
+    def __len__(self) -> int:
+        return (len(self._offsets) - 1) // len(self.fields) if self.fields else 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("row out of range")
+
+        width = len(self.fields)
+        bounds = self._offsets[index * width:(index + 1) * width + 1].tolist()
+        return {
+            field: str(self._heap[bounds[i]:bounds[i + 1]], "utf-8")
+            for i, field in enumerate(self.fields)
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        for index in range(len(self)):
+            yield self[index]
+
+
+def write_corpus_binary(corpus: ResumeCorpus, schema_key: str, path: str) -> str:
+    """
+    Write a corpus (columns, rows, candidate index) as one binary file via temp file + rename
+    Layout: magic, 8-byte aligned sections, JSON header describing every
+    section (offset, dtype, length), then the trailer locating the header.
+    Row fields are one heap with row-major offsets (row i, field j at
+    offsets[i * n_fields + j]).
+    """
+    fields = list(corpus.rows[0].keys()) if len(corpus) else []
+    row_offsets, row_heap = pack_strings([row.get(field) or "" for row in corpus.rows for field in fields])
+
+    sections: Dict[str, Any] = {f"column.{name}": values for name, values in corpus.columns().items()}
+    sections["rows.offsets"] = row_offsets
+    sections["rows.heap"] = row_heap
+
+    index = corpus.index
+    if index.vectorizer is not None:
+        terms = sorted(index.vectorizer.vocabulary_.items(), key=lambda item: item[1])
+        sections["index.vocabulary.offsets"], sections["index.vocabulary.heap"] = pack_strings([term for term, _ in terms])
+        sections["index.idf"] = index.vectorizer.idf_
+    postings = index.postings
+    sections["index.data"] = postings.data
+    sections["index.indices"] = postings.indices
+    sections["index.indptr"] = postings.indptr
+    sections["index.max_weights"] = index.max_weights
+    sections["index.column_sums"] = index.column_sums
+
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=BINARY_SUFFIX)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(BINARY_MAGIC)
+            layout: Dict[str, List] = {}
+            for name, value in sections.items():
+                f.write(b"\0" * (-f.tell() % SECTION_ALIGNMENT))
+                if isinstance(value, bytes):
+                    layout[name] = [f.tell(), "bytes", len(value)]
+                    f.write(value)
+                else:
+                    array = np.ascontiguousarray(value)
+                    layout[name] = [f.tell(), array.dtype.str, len(array)]
+                    f.write(array.tobytes())
+
+            header = json.dumps({
+                "schema": schema_key,
+                "rows": len(corpus),
+                "fields": fields,
+                "terms": postings.shape[1],
+                "sections": layout,
+            }, ensure_ascii=False).encode("utf-8")
+            header_offset = f.tell()
+            f.write(header)
+            f.write(TRAILER.pack(header_offset, len(header)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return path
+
+
+def read_corpus_binary(path: str, schema_key: str, matcher: Any) -> Optional[ResumeCorpus]:
+    """
+    Map a binary corpus read-only; columns, rows and index are views into the mapping
+    Pages are shared through the OS page cache by every process mapping the
+    same file. Returns None if the file is missing, not a corpus file or was
+    written with another schema_key.
+    """
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    buffer = memoryview(mapped)
+    if len(buffer) < len(BINARY_MAGIC) + TRAILER.size or bytes(buffer[:len(BINARY_MAGIC)]) != BINARY_MAGIC:
+        return None
+
+    header_offset, header_length = TRAILER.unpack_from(buffer, len(buffer) - TRAILER.size)
+    header = json.loads(str(buffer[header_offset:header_offset + header_length], "utf-8"))
+    if header["schema"] != schema_key:
+        return None
+
+    def section(name: str):
+        offset, dtype, length = header["sections"][name]
+        if dtype == "bytes":
+            return buffer[offset:offset + length]
+        return np.frombuffer(buffer, dtype=np.dtype(dtype), count=length, offset=offset)
+
+    sections = header["sections"]
+    rows = MappedRows(header["fields"], section("rows.offsets"), section("rows.heap"))
+    columns = {
+        name[len("column."):]: section(name)
+        for name in sections if name.startswith("column.")
+    }
+
+    vectorizer = None
+    if "index.idf" in sections:
+        vocabulary = MappedRows(["term"], section("index.vocabulary.offsets"), section("index.vocabulary.heap"))
+        vectorizer = matcher.make_position_vectorizer()
+        vectorizer.vocabulary_ = {row["term"]: term_id for term_id, row in enumerate(vocabulary)}
+        vectorizer.idf_ = section("index.idf")
+
+    postings = sparse.csc_matrix(
+        (section("index.data"), section("index.indices"), section("index.indptr")),
+        shape=(header["rows"], header["terms"])
+    )
+    index = CandidateIndex(vectorizer, postings, section("index.max_weights"), section("index.column_sums"))
+    return ResumeCorpus(rows, columns, index)
@@ -0,0 +1,283 @@
+import asyncio
+import hashlib
+import inspect
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from controllers.corpus_snapshots import SnapshotStore
+from controllers.corpus_store import ResumeCorpusStore
+from controllers.jobthai_scraper import DEFAULT_SEARCH, SearchQuery, scrape_jobthai_resumes_async
+from controllers.page_cache import RawPageCache
+from controllers.scrape_metrics import MetricsLog
+
+logger = logging.getLogger(__name__)
+
+
+class CorpusSnapshot:
+    """A pinned, immutable version of a scraped JobThai corpus"""
+
+    def __init__(
+        self,
+        version: str,
+        csv_path: str,
+        scraped_at: float,
+        failed_pages: Optional[Dict[str, List[int]]] = None
+    ):
+        self.version = version
+        self.csv_path = csv_path
+        self.scraped_at = scraped_at
+        # SearchQuery.key() -> listing pages missing from this version
+        self.failed_pages = failed_pages or {}
+
+    def age_seconds(self) -> float:
+        return time.time() - self.scraped_at
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": self.version,
+            "csv_file": self.csv_path,
+            "scraped_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.scraped_at)),
+            "age_seconds": round(self.age_seconds(), 1),
+            # False when listing pages are missing (see failed_pages)
+            "complete": not self.failed_pages,
+            "failed_pages": self.failed_pages
+        }
+
+
+class CorpusRefresher:
+    """
+    Keeps the latest scraped snapshot per search configuration
+    Requests read whatever snapshot is current and only wait for a scrape when
+    the snapshot is missing or older than the staleness they accept. A
+    background task re-scrapes every registered configuration once its
+    snapshot is older than refresh_interval.
+    Snapshots live in a SnapshotStore per configuration under snapshot_dir, so
+    every worker process sees the same CURRENT version.
+    scrape_fn may be a coroutine function (awaited) or a blocking function
+    (run in a worker thread). With incremental, refreshes only fetch pages
+    until they reach resumes unchanged since the current snapshot. With a
+    page_cache every fetched page is archived for offline replay.
+    scrape_fn returns a ScrapeResult; listing pages it reports as failed are
+    attached to the snapshot they were left out of, and its metrics are
+    recorded in metrics_log when given.
+    """
+
+    def __init__(
+        self,
+        refresh_interval: float = 30 * 60,
+        idle_timeout: float = 24 * 60 * 60,
+        scrape_fn: Callable[..., Any] = scrape_jobthai_resumes_async,
+        snapshot_dir: Optional[str] = None,
+        retention: int = 5,
+        corpus_store: Optional[ResumeCorpusStore] = None,
+        incremental: bool = True,
+        page_cache: Optional[RawPageCache] = None,
+        metrics_log: Optional[MetricsLog] = None
+    ):
+        self.refresh_interval = refresh_interval
+        self.idle_timeout = idle_timeout
+        self.scrape_fn = scrape_fn
+        self.snapshot_dir = snapshot_dir or os.path.join(os.getcwd(), "snapshots")
+        self.retention = retention
+        self._corpus_store = corpus_store
+        self.incremental = incremental
+        self.page_cache = page_cache
+        self.metrics_log = metrics_log
+
+        self._stores: Dict[str, SnapshotStore] = {}
+        self._configs: Dict[str, Dict] = {}
+        self._last_used: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # key -> (version, pages missing from that version per search)
+        self._failed_pages: Dict[str, Tuple[str, Dict[str, List[int]]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def config_key(max_pages: int, queries: Optional[List[SearchQuery]] = None) -> str:
+        """Search configuration key, e.g. "computer-level1-p10" for the default search"""
+        searches = "+".join(sorted(query.key() for query in set(queries or [DEFAULT_SEARCH])))
+        if len(searches) > 80:
+            searches = f"multi-{hashlib.sha1(searches.encode('utf-8')).hexdigest()[:12]}"
+        return f"{searches}-p{max_pages}"
+
+    def register(
+        self,
+        phpsessid: str,
+        guest_id: str,
+        fcnec: str,
+        max_pages: int,
+        queries: Optional[List[SearchQuery]] = None
+    ) -> str:
+        """Remember (or update the cookies of) a search configuration for background refreshes"""
+        key = self.config_key(max_pages, queries)
+        self._configs[key] = {
+            "phpsessid": phpsessid,
+            "guest_id": guest_id,
+            "fcnec": fcnec,
+            "max_pages": max_pages,
+            "queries": sorted(set(queries or [DEFAULT_SEARCH]), key=SearchQuery.key)
+        }
+        self._last_used[key] = time.time()
+        self._locks.setdefault(key, asyncio.Lock())
+        return key
+
+    @property
+    def corpus_store(self) -> ResumeCorpusStore:
+        """SQLite corpus every scrape is upserted into (opened on first use)"""
+        if self._corpus_store is None:
+            self._corpus_store = ResumeCorpusStore()
+        return self._corpus_store
+
+    def store_for(self, key: str) -> SnapshotStore:
+        store = self._stores.get(key)
+        if store is None:
+            store = SnapshotStore(os.path.join(self.snapshot_dir, key), retention=self.retention)
+            self._stores[key] = store
+        return store
+
+    def latest(self, key: str) -> Optional[CorpusSnapshot]:
+        """Pin the CURRENT snapshot version of a configuration (None if never scraped)"""
+        store = self.store_for(key)
+        version = store.current_version()
+        if version is None:
+            return None
+        failed_version, failed_pages = self._failed_pages.get(key, (None, {}))
+        return CorpusSnapshot(
+            version, store.path_for(version), store.version_timestamp(version),
+            failed_pages if failed_version == version else None
+        )
+
+    async def get_snapshot(
+        self,
+        phpsessid: str,
+        guest_id: str,
+        fcnec: str,
+        max_pages: int,
+        max_age: Optional[float] = None,
+        queries: Optional[List[SearchQuery]] = None
+    ) -> CorpusSnapshot:
+        """
+        Return the current snapshot for this configuration
+        Scrapes first only if there is no snapshot yet or it is older than max_age
+        seconds (max_age=0 forces a refresh, None accepts any age).
+        """
+        key = self.register(phpsessid, guest_id, fcnec, max_pages, queries)
+        snapshot = self.latest(key)
+
+        if snapshot is None or (max_age is not None and snapshot.age_seconds() > max_age):
+            snapshot = await self.refresh(key, max_age=max_age)
+
+        return snapshot
+
+    def publish(
+        self,
+        key: str,
+        rows: List[Dict[str, str]],
+        failed_pages: Optional[Dict[str, List[int]]] = None,
+        upserted: bool = False
+    ) -> CorpusSnapshot:
+        """
+        Store rows scraped elsewhere (e.g. by the streaming endpoint) as the newest snapshot
+        They are upserted into the corpus store too, unless the caller already did (upserted)
+        """
+        version = self.store_for(key).write(rows)
+        if failed_pages:
+            self._failed_pages[key] = (version, failed_pages)
+        if not upserted:
+            self.corpus_store.upsert_rows(rows)
+        return self.latest(key)
+
+    async def refresh(self, key: str, max_age: Optional[float] = None) -> CorpusSnapshot:
+        """
+        Scrape a configuration, coalescing concurrent refreshes of the same key
+        Refreshes in this process share an asyncio lock; across worker processes
+        the store's scrape_lock() serialises them, and a worker that waited for
+        it takes the snapshot the other one published instead of scraping again.
+        """
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            # Another request may have refreshed while we waited for the lock
+            snapshot = self.latest(key)
+            if snapshot is not None and max_age is not None and snapshot.age_seconds() <= max_age:
+                return snapshot
+            seen_version = snapshot.version if snapshot is not None else None
+
+            async with self.store_for(key).scrape_lock():
+                # Another worker process may have published while we waited for the file lock
+                snapshot = self.latest(key)
+                if (
+                    snapshot is not None and snapshot.version != seen_version and
+                    (max_age is None or snapshot.age_seconds() <= max_age)
+                ):
+                    logger.info(f"Corpus {key} was refreshed by another worker: version {snapshot.version}")
+                    return snapshot
+
+                config = self._configs[key]
+                logger.info(f"Refreshing JobThai corpus for {key}...")
+                scrape_kwargs = {
+                    "phpsessid": config["phpsessid"],
+                    "guest_id": config["guest_id"],
+                    "fcnec": config["fcnec"],
+                    "max_pages": config["max_pages"],
+                    "queries": config["queries"],
+                    "snapshot_store": self.store_for(key),
+                    "corpus_store": self.corpus_store,
+                    "incremental": self.incremental
+                }
+                if self.page_cache is not None:
+                    scrape_kwargs["page_cache"] = self.page_cache
+                # The scrape runs with the lock held (a blocking scrape_fn's thread inherits it)
+                if inspect.iscoroutinefunction(self.scrape_fn):
+                    result = await self.scrape_fn(**scrape_kwargs)
+                else:
+                    result = await asyncio.to_thread(self.scrape_fn, **scrape_kwargs)
+
+                version = self.store_for(key).current_version()
+
+            if self.metrics_log is not None and result.metrics is not None:
+                self.metrics_log.record_scrape(key, result.metrics)
+
+            if not result.complete:
+                failed_pages = result.to_dict()["failed_pages"]
+                logger.warning(f"Corpus {key} refreshed without pages {failed_pages}")
+                self._failed_pages[key] = (version, failed_pages)
+            else:
+                self._failed_pages.pop(key, None)
+
+            snapshot = self.latest(key)
+            logger.info(f"Corpus {key} refreshed: version {snapshot.version}")
+            return snapshot
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(min(self.refresh_interval, 60))
+            now = time.time()
+
+            for key in list(self._configs):
+                if now - self._last_used.get(key, 0) > self.idle_timeout:
+                    # Nobody has asked for this configuration in a while
+                    self._configs.pop(key, None)
+                    continue
+
+                snapshot = self.latest(key)
+                if snapshot is not None and snapshot.age_seconds() < self.refresh_interval:
+                    continue
+
+                try:
+                    await self.refresh(key, max_age=self.refresh_interval)
+                except Exception as e:
+                    logger.warning(f"Background refresh of {key} failed: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,338 @@
+import asyncio
+import contextvars
+import csv
+import json
+import os
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, FrozenSet, List, Optional, Set
+try:
+    import fcntl
+except ImportError:  # Windows: ScrapeLock uses msvcrt instead
+    fcntl = None
+    import msvcrt
+
+CURRENT_POINTER = "CURRENT"
+SCRAPE_LOCK = "scrape.lock"
+SNAPSHOT_PREFIX = "jobthai_resumes_"
+SNAPSHOT_SUFFIX = ".csv"
+
+
+def atomic_write_text(path: str, text: str) -> None:
+    """Write a small text file via temp file + rename so readers never see it half written"""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def atomic_write_csv(rows: List[Dict[str, str]], path: str) -> str:
+    """Write resume rows as UTF-8 (BOM) CSV via temp file + rename"""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=SNAPSHOT_SUFFIX)
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+            writer.writeheader()
+            writer.writerows(rows)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return path
+
+
+class CheckpointedCsvWriter:
+    """
+    Resumable CSV output for long scrapes
+    Each completed page's rows are appended to <path>.part and fsynced, then
+    <path>.checkpoint records the page number, row count and the part file's
+    byte length (written via temp file + rename). open() resumes an
+    unfinished part file whose checkpoint has the same params and is younger
+    than max_age: bytes written after the checkpoint are truncated and the
+    caller continues after the checkpointed page. Rows whose key_field was
+    already written are skipped, so a listing that shifted between attempts
+    does not duplicate resumes. finish() renames the part file to path.
+    state is free-form caller data persisted with every checkpoint.
+    """
+
+    def __init__(self, path: str, params: Dict[str, Any], key_field: str, max_age: float = 60 * 60):
+        self.path = path
+        self.part_path = path + ".part"
+        self.checkpoint_path = path + ".checkpoint"
+        self.params = params
+        self.key_field = key_field
+        self.max_age = max_age
+
+        self.last_page = 0
+        self.row_count = 0
+        self.seen_keys: Set[str] = set()
+        self.state: Dict[str, Any] = {}
+        self._fieldnames: Optional[List[str]] = None
+        self._file = None
+
+    def _read_checkpoint(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if checkpoint.get("params") != self.params or time.time() - checkpoint.get("updated_at", 0) > self.max_age:
+            return None
+        if not os.path.exists(self.part_path) or os.path.getsize(self.part_path) < checkpoint["bytes"]:
+            return None
+        return checkpoint
+
+    def open(self) -> int:
+        """Open for writing; returns the last completed page to continue after (0 on a fresh start)"""
+        checkpoint = self._read_checkpoint()
+        if checkpoint is None:
+            self._file = open(self.part_path, "w", newline="", encoding="utf-8-sig")
+            return 0
+
+        with open(self.part_path, "r+b") as f:
+            f.truncate(checkpoint["bytes"])
+        with open(self.part_path, "r", newline="", encoding="utf-8-sig") as f:
+            self.seen_keys = {row.get(self.key_field) for row in csv.DictReader(f)}
+
+        self.last_page = checkpoint["page"]
+        self.row_count = checkpoint["rows"]
+        self.state = checkpoint.get("state", {})
+        self._fieldnames = checkpoint.get("fieldnames")
+        # Appending mid-file: no second BOM
+        self._file = open(self.part_path, "a", newline="", encoding="utf-8")
+        return self.last_page
+
+    def write_rows(self, rows: List[Dict[str, str]]) -> int:
+        """Append rows not written before; returns how many were written"""
+        rows = [row for row in rows if row.get(self.key_field) not in self.seen_keys]
+        if not rows:
+            return 0
+        if self._fieldnames is None:
+            self._fieldnames = list(rows[0].keys())
+            csv.DictWriter(self._file, fieldnames=self._fieldnames).writeheader()
+        csv.DictWriter(self._file, fieldnames=self._fieldnames).writerows(rows)
+        self.seen_keys.update(row.get(self.key_field) for row in rows)
+        self.row_count += len(rows)
+        return len(rows)
+
+    def write_page(self, page: int, rows: List[Dict[str, str]]) -> int:
+        """Append one completed page and checkpoint it"""
+        written = self.write_rows(rows)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.last_page = page
+        atomic_write_text(self.checkpoint_path, json.dumps({
+            "params": self.params,
+            "page": page,
+            "rows": self.row_count,
+            "bytes": self._file.tell(),
+            "fieldnames": self._fieldnames,
+            "state": self.state,
+            "updated_at": time.time()
+        }, ensure_ascii=False))
+        return written
+
+    def close(self) -> None:
+        """Stop writing but keep the part file and checkpoint for a later resume"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def finish(self) -> str:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.close()
+        os.replace(self.part_path, self.path)
+        self._remove(self.checkpoint_path)
+        return self.path
+
+    def discard(self) -> None:
+        self.close()
+        self._remove(self.part_path)
+        self._remove(self.checkpoint_path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+# Paths of the ScrapeLocks held by the current task (and the threads it starts)
+_held_scrape_locks: contextvars.ContextVar[FrozenSet[str]] = contextvars.ContextVar("held_scrape_locks", default=frozenset())
+
+
+class ScrapeLock:
+    """
+    Exclusive OS-level lock on a file, shared by every worker process
+    Used as `async with`: waiting happens in a worker thread, and the lock is
+    re-entrant within one task (a scrape started by a holder of the lock
+    does not wait for itself). flock on POSIX, msvcrt.locking on Windows.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._token = None
+
+    @property
+    def held(self) -> bool:
+        """Whether the current task already holds this lock"""
+        return self.path in _held_scrape_locks.get()
+
+    def acquire(self) -> None:
+        """Block until the lock is ours"""
+        f = open(self.path, "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        f.seek(0)
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK gives up after ~10 seconds; keep waiting
+                        continue
+        except BaseException:
+            f.close()
+            raise
+        self._file = f
+
+    def release(self) -> None:
+        f, self._file = self._file, None
+        if f is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            f.close()
+
+    async def __aenter__(self) -> "ScrapeLock":
+        if not self.held:
+            await asyncio.to_thread(self.acquire)
+            self._token = _held_scrape_locks.set(_held_scrape_locks.get() | {self.path})
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._token is not None:
+            _held_scrape_locks.reset(self._token)
+            self._token = None
+            self.release()
+
+
+class SnapshotStore:
+    """
+    Versioned, append-only scrape snapshots in one directory
+    Every write lands in a new immutable file (temp file + rename) and then
+    moves the CURRENT pointer, so concurrent workers never read a file that
+    is being written. Readers pin a version once and keep reading that file;
+    only the newest `retention` versions (plus anything younger than
+    `grace_seconds`) are kept on disk.
+    """
+
+    def __init__(self, root_dir: str, retention: int = 5, grace_seconds: float = 10 * 60):
+        self.root_dir = root_dir
+        self.retention = retention
+        self.grace_seconds = grace_seconds
+        os.makedirs(root_dir, exist_ok=True)
+
+    @staticmethod
+    def new_version() -> str:
+        """Sortable version ID: millisecond timestamp + random suffix"""
+        return f"{int(time.time() * 1000):013d}-{uuid.uuid4().hex[:8]}"
+
+    @staticmethod
+    def version_timestamp(version: str) -> float:
+        return int(version.split("-")[0]) / 1000.0
+
+    def path_for(self, version: str) -> str:
+        return os.path.join(self.root_dir, f"{SNAPSHOT_PREFIX}{version}{SNAPSHOT_SUFFIX}")
+
+    def files_for(self, version: str) -> List[str]:
+        """The version's CSV plus any derived files stored next to it (e.g. its binary form)"""
+        stem = f"{SNAPSHOT_PREFIX}{version}."
+        return [os.path.join(self.root_dir, name) for name in os.listdir(self.root_dir) if name.startswith(stem)]
+
+    def versions(self) -> List[str]:
+        """All snapshot versions on disk, oldest first"""
+        versions = []
+        for name in os.listdir(self.root_dir):
+            if name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX):
+                versions.append(name[len(SNAPSHOT_PREFIX):-len(SNAPSHOT_SUFFIX)])
+        return sorted(versions)
+
+    def current_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root_dir, CURRENT_POINTER), encoding="utf-8") as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return version if version and os.path.exists(self.path_for(version)) else None
+
+    def read_rows(self, version: str) -> List[Dict[str, str]]:
+        with open(self.path_for(version), "r", encoding="utf-8-sig") as f:
+            return list(csv.DictReader(f))
+
+    def write(self, rows: List[Dict[str, str]]) -> str:
+        """Write rows as a new snapshot, make it current and prune old ones. Returns the version"""
+        version = self.new_version()
+        atomic_write_csv(rows, self.path_for(version))
+        self.set_current(version)
+        self.prune()
+        return version
+
+    def staging_path(self) -> str:
+        """
+        Where a snapshot is written incrementally before adopt(); never listed as a version
+        Only one scrape per store may use it: hold scrape_lock() from staging to adopt()
+        """
+        return os.path.join(self.root_dir, "scrape_in_progress.csv")
+
+    def scrape_lock(self) -> ScrapeLock:
+        """Cross-process lock serialising scrapes into this store (staging, checkpoint resume, adopt)"""
+        return ScrapeLock(os.path.join(self.root_dir, SCRAPE_LOCK))
+
+    def adopt(self, csv_path: str) -> str:
+        """Move a fully written CSV (on the same filesystem) in as a new current snapshot. Returns the version"""
+        version = self.new_version()
+        os.replace(csv_path, self.path_for(version))
+        self.set_current(version)
+        self.prune()
+        return version
+
+    def set_current(self, version: str) -> None:
+        atomic_write_text(os.path.join(self.root_dir, CURRENT_POINTER), version)
+
+    def prune(self) -> None:
+        current = self.current_version()
+        versions = self.versions()
+        now = time.time()
+
+        for version in versions[:-self.retention] if self.retention > 0 else versions:
+            if version == current or now - self.version_timestamp(version) < self.grace_seconds:
+                continue
+            for path in self.files_for(version):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
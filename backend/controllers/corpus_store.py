@@ -0,0 +1,292 @@
+import json
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# ระดับการศึกษา -> level code (also the matcher's education points)
+EDUCATION_LEVELS = {
+    'ปริญญาเอก': 5,
+    'ปริญญาโท': 4,
+    'ปริญญาตรี': 3,
+    'ปวส': 2,
+    'ปวช': 1,
+    'มัธยมศึกษา': 0
+}
+
+THAI_MONTH_ABBREVIATIONS = {
+    'ม.ค.': 1, 'ก.พ.': 2, 'มี.ค.': 3, 'เม.ย.': 4, 'พ.ค.': 5, 'มิ.ย.': 6,
+    'ก.ค.': 7, 'ส.ค.': 8, 'ก.ย.': 9, 'ต.ค.': 10, 'พ.ย.': 11, 'ธ.ค.': 12
+}
+
+# CSV column -> table column
+ROW_COLUMNS = {
+    "ลำดับ": "list_order",
+    "เรซูเม่ ID": "resume_id",
+    "คะแนน": "score",
+    "อายุ": "age",
+    "ตำแหน่งที่สมัคร": "position",
+    "จังหวัด": "province",
+    "เงินเดือน": "salary",
+    "ระดับการศึกษา": "education",
+    "สาขา": "field",
+    "มหาวิทยาลัย": "university",
+    "ตำแหน่งที่เคยทำ": "experience",
+    "อัปเดตล่าสุด": "last_update",
+    "ลิงก์โปรไฟล์": "profile_url",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumes (
+    resume_id TEXT PRIMARY KEY,
+    list_order TEXT,
+    score TEXT,
+    age TEXT,
+    position TEXT,
+    province TEXT,
+    salary TEXT,
+    education TEXT,
+    field TEXT,
+    university TEXT,
+    experience TEXT,
+    last_update TEXT,
+    profile_url TEXT,
+    salary_min INTEGER NOT NULL DEFAULT 0,
+    salary_max INTEGER NOT NULL DEFAULT 0,
+    education_level INTEGER NOT NULL DEFAULT -1,
+    last_update_date TEXT,
+    first_seen_at REAL NOT NULL,
+    scraped_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_resumes_province ON resumes (province);
+CREATE INDEX IF NOT EXISTS idx_resumes_salary ON resumes (salary_min, salary_max);
+CREATE INDEX IF NOT EXISTS idx_resumes_education ON resumes (education_level);
+CREATE INDEX IF NOT EXISTS idx_resumes_last_update ON resumes (last_update_date);
+CREATE INDEX IF NOT EXISTS idx_resumes_scraped_at ON resumes (scraped_at);
+CREATE TABLE IF NOT EXISTS position_tokens (
+    text_key TEXT PRIMARY KEY,
+    tokens TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS resume_profiles (
+    resume_id TEXT PRIMARY KEY,
+    last_update TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+# Keys per IN (...) lookup, well under SQLite's bound-parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+
+def parse_salary_range(salary_str: str) -> tuple[int, int]:
+    """Parse salary string to min/max values ("15, 000-18, 000" -> (15000, 18000))"""
+    if not salary_str or salary_str == "-":
+        return (0, 0)
+
+    # Remove commas and spaces
+    salary_str = salary_str.replace(',', '').replace(' ', '')
+
+    # Extract numbers
+    numbers = re.findall(r'\d+', salary_str)
+
+    if len(numbers) >= 2:
+        return (int(numbers[0]), int(numbers[1]))
+    elif len(numbers) == 1:
+        val = int(numbers[0])
+        return (val, val)
+    return (0, 0)
+
+
+def parse_education_level(education: str) -> int:
+    """Education level code of the first known level in the text (-1 if none)"""
+    for level, code in EDUCATION_LEVELS.items():
+        if level in education:
+            return code
+    return -1
+
+
+def parse_thai_short_date(text: str) -> Optional[str]:
+    """
+    Parse JobThai's "21 ต.ค. 68" (Buddhist Era, 2-digit year) to ISO "2025-10-21"
+    Returns None when the text is not in that format
+    """
+    match = re.match(r'\s*(\d{1,2})\s+(\S+)\s+(\d{2,4})\s*$', text or "")
+    if not match:
+        return None
+
+    month = THAI_MONTH_ABBREVIATIONS.get(match.group(2))
+    if month is None:
+        return None
+
+    year = int(match.group(3))
+    if year < 100:
+        year += 2500
+    year -= 543
+
+    try:
+        return date(year, month, int(match.group(1))).isoformat()
+    except ValueError:
+        return None
+
+
+class ResumeCorpusStore:
+    """
+    Local SQLite store of every scraped resume, upserted by เรซูเม่ ID
+    Parsed salary range, education level and last-update date are stored in
+    indexed columns, so hard filters run in SQL and only eligible rows are
+    handed to the matcher. WAL mode lets several workers read while one writes.
+    Segmented position texts (see PositionTokenCache) and enriched profile
+    details (see ProfileEnricher) are persisted here too.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.path.join(os.getcwd(), "jobthai_corpus.db")
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def upsert_rows(self, rows: List[Dict[str, str]]) -> int:
+        """Insert new resumes and refresh existing ones. Returns the number of rows written"""
+        now = time.time()
+        records = []
+        for row in rows:
+            if not row.get("เรซูเม่ ID"):
+                continue
+            record = {column: row.get(key, "") for key, column in ROW_COLUMNS.items()}
+            record["salary_min"], record["salary_max"] = parse_salary_range(record["salary"])
+            record["education_level"] = parse_education_level(record["education"])
+            record["last_update_date"] = parse_thai_short_date(record["last_update"])
+            record["first_seen_at"] = now
+            record["scraped_at"] = now
+            records.append(record)
+
+        if not records:
+            return 0
+
+        columns = list(records[0].keys())
+        updates = ", ".join(
+            f"{column} = excluded.{column}" for column in columns
+            if column not in ("resume_id", "first_seen_at")
+        )
+        sql = (
+            f"INSERT INTO resumes ({', '.join(columns)}) "
+            f"VALUES ({', '.join(':' + column for column in columns)}) "
+            f"ON CONFLICT(resume_id) DO UPDATE SET {updates}"
+        )
+
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(sql, records)
+        return len(records)
+
+    def query(
+        self,
+        max_salary: Optional[int] = None,
+        provinces: Optional[List[str]] = None,
+        min_education_level: Optional[int] = None,
+        updated_within_days: Optional[int] = None,
+        resume_ids: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Resumes passing every given hard filter, in CSV row shape (Thai keys)
+        max_salary keeps candidates whose minimum expected salary fits the budget
+        (unknown salaries are kept, as the matcher scores them neutrally).
+        updated_within_days likewise keeps resumes whose อัปเดตล่าสุด could not be parsed.
+        resume_ids limits the query to those resumes (e.g. one snapshot's);
+        they are joined through a temporary table, so any number is fine.
+        """
+        clauses = []
+        params: List = []
+        if resume_ids is not None:
+            clauses.append("resume_id IN (SELECT resume_id FROM temp.query_scope)")
+
+        if max_salary is not None:
+            clauses.append("salary_min <= ?")
+            params.append(max_salary)
+        if provinces:
+            clauses.append(f"province IN ({', '.join('?' for _ in provinces)})")
+            params.extend(provinces)
+        if min_education_level is not None:
+            clauses.append("education_level >= ?")
+            params.append(min_education_level)
+        if updated_within_days is not None:
+            clauses.append("(last_update_date >= ? OR last_update_date IS NULL)")
+            params.append((date.today() - timedelta(days=updated_within_days)).isoformat())
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT * FROM resumes {where} ORDER BY scraped_at DESC, CAST(list_order AS INTEGER)"
+
+        with closing(self._connect()) as conn:
+            if resume_ids is not None:
+                conn.execute("CREATE TEMP TABLE query_scope (resume_id TEXT PRIMARY KEY)")
+                conn.executemany("INSERT OR IGNORE INTO temp.query_scope VALUES (?)", ((resume_id,) for resume_id in resume_ids))
+            result = conn.execute(sql, params).fetchall()
+
+        return [{key: row[column] for key, column in ROW_COLUMNS.items()} for row in result]
+
+    def data_version(self) -> str:
+        """Changes on every upsert (newest scraped_at); sorts in write order"""
+        with closing(self._connect()) as conn:
+            latest = conn.execute("SELECT MAX(scraped_at) FROM resumes").fetchone()[0]
+        return f"{latest or 0:020.6f}"
+
+    def load_tokens(self, keys: List[str]) -> Dict[str, List[str]]:
+        """Persisted token lists for the given text keys (missing keys are left out)"""
+        tokens: Dict[str, List[str]] = {}
+        with closing(self._connect()) as conn:
+            for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+                batch = keys[start:start + LOOKUP_BATCH_SIZE]
+                result = conn.execute(
+                    f"SELECT text_key, tokens FROM position_tokens WHERE text_key IN ({', '.join('?' for _ in batch)})",
+                    batch
+                )
+                for row in result:
+                    tokens[row["text_key"]] = json.loads(row["tokens"])
+        return tokens
+
+    def save_tokens(self, tokens: Dict[str, List[str]]) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO position_tokens (text_key, tokens) VALUES (?, ?)",
+                [(key, json.dumps(value, ensure_ascii=False)) for key, value in tokens.items()]
+            )
+
+    def load_profiles(self, keys: List[Tuple[str, str]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Enriched profiles for (resume_id, last_update) keys, by resume ID
+        A profile stored for another last_update is stale and left out.
+        """
+        wanted = dict(keys)
+        resume_ids = list(wanted)
+        profiles: Dict[str, Dict[str, Any]] = {}
+        with closing(self._connect()) as conn:
+            for start in range(0, len(resume_ids), LOOKUP_BATCH_SIZE):
+                batch = resume_ids[start:start + LOOKUP_BATCH_SIZE]
+                result = conn.execute(
+                    f"SELECT resume_id, last_update, profile FROM resume_profiles WHERE resume_id IN ({', '.join('?' for _ in batch)})",
+                    batch
+                )
+                for row in result:
+                    if row["last_update"] == wanted[row["resume_id"]]:
+                        profiles[row["resume_id"]] = json.loads(row["profile"])
+        return profiles
+
+    def save_profiles(self, profiles: Dict[Tuple[str, str], Dict[str, Any]]) -> None:
+        """Store enriched profiles by (resume_id, last_update), replacing older ones"""
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO resume_profiles (resume_id, last_update, profile, fetched_at) VALUES (?, ?, ?, ?)",
+                [
+                    (resume_id, last_update, json.dumps(profile, ensure_ascii=False, default=str), now)
+                    for (resume_id, last_update), profile in profiles.items()
+                ]
+            )
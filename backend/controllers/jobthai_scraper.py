@@ -1,10 +1,24 @@
-import requests
+import asyncio
+import httpx
+from contextlib import aclosing, nullcontext
 from bs4 import BeautifulSoup
-import csv
-import time
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:  # parse_resume_rows falls back to html.parser
+    etree = lxml_html = None
+import hashlib
 import os
 import re
-from typing import List, Dict
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator, List, Dict, Optional, Set, Tuple
+from urllib.parse import quote_plus, urlsplit
+
+from controllers.corpus_snapshots import CheckpointedCsvWriter, SnapshotStore
+from controllers.corpus_store import ResumeCorpusStore
+from controllers.page_cache import RawPageCache
+from controllers.rate_limit import CircuitBreaker, CircuitOpenError, SharedTokenBucket, TokenBucket, backoff_delay
+from controllers.scrape_metrics import PageMetrics, ScrapeMetrics
 
 def clean_text(text: str) -> str:
     """
@@ -38,111 +52,680 @@ def clean_url(url: str) -> str:
     
     return url
 
-def scrape_jobthai_resumes(phpsessid: str, guest_id: str, fcnec: str, max_pages: int = 50) -> str:
+# Agreed request rate towards JobThai, shared by every scrape in every worker
+# process started from the same directory: the original pacing of one request
+# per 1.5 s, with no bursts
+JOBTHAI_REQUESTS_PER_SECOND = 1 / 1.5
+JOBTHAI_BURST = 1
+jobthai_rate_limiter = SharedTokenBucket(
+    os.path.join(os.getcwd(), "jobthai_rate_limit"), JOBTHAI_REQUESTS_PER_SECOND, JOBTHAI_BURST
+)
+
+# Result pages fetched at once (and pooled keep-alive connections)
+MAX_CONCURRENT_PAGES = 4
+REQUEST_TIMEOUT = 15
+
+# Per-page retries of transient failures (connection errors, 429, 5xx)
+PAGE_RETRIES = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 20.0
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# Session cookies refused: fatal for the scrape
+REJECTED_SESSION_STATUS_CODES = {401, 403}
+
+# Consecutive failed requests after which JobThai is left alone for a minute
+jobthai_circuit_breaker = CircuitBreaker(failure_threshold=8, reset_timeout=60)
+
+# Site root; point JOBTHAI_BASE_URL at a stand-in (benchmarks/jobthai_standin.py) to scrape offline
+JOBTHAI_BASE_URL = os.environ.get("JOBTHAI_BASE_URL", "https://www3.jobthai.com").rstrip("/")
+JOBTHAI_SEARCH_PATH = "/findresume/resume_list.php?&search-section=pagination&StepSearch=1&search=Y&jobtype={jobtype}&level=1&region={region}&KeyWord={keyword}&fieldsearch=All&p={page}&search-section=pagination"
+
+@dataclass(frozen=True)
+class SearchQuery:
+    """One JobThai resume search (a listing paged through by p=)"""
+    jobtype: str = "Computer"
+    region: str = ""
+    keyword: str = ""
+    
+    def url(self, page: int) -> str:
+        return JOBTHAI_BASE_URL + JOBTHAI_SEARCH_PATH.format(
+            jobtype=quote_plus(self.jobtype),
+            region=quote_plus(self.region),
+            keyword=quote_plus(self.keyword),
+            page=page
+        )
+    
+    @staticmethod
+    def _slug(value: str) -> str:
+        slug = re.sub(r'[^a-z0-9]+', '', value.lower())
+        return slug if slug and len(slug) <= 20 else hashlib.sha1(value.encode("utf-8")).hexdigest()[:8]
+    
+    def key(self) -> str:
+        """Short filesystem-safe name, "computer-level1" for the default search"""
+        key = f"{self._slug(self.jobtype) if self.jobtype else 'all'}-level1"
+        if self.region:
+            key += f"-r{self._slug(self.region)}"
+        if self.keyword:
+            key += f"-k{self._slug(self.keyword)}"
+        return key
+
+DEFAULT_SEARCH = SearchQuery()
+
+# span id fragment -> CSV column; per column the first span (document order) whose id contains the fragment wins
+ROW_SPAN_FIELDS = (
+    ("resumeRankingPercent", "คะแนน"),
+    ("text-age", "อายุ"),
+    ("positionValue", "ตำแหน่งที่สมัคร"),
+    ("lastUpdateValue", "อัปเดตล่าสุด"),
+    ("addressValue", "จังหวัด"),
+    ("salaryValue", "เงินเดือน"),
+    ("grad1LevelValue", "ระดับการศึกษา"),
+    ("grad1FieldValue", "สาขา"),
+    ("grad1SchoolValue", "มหาวิทยาลัย"),
+    ("workExperienceValue", "ตำแหน่งที่เคยทำ"),
+    ("text-no", "ลำดับ"),
+)
+
+# Listing entries that are not real candidates
+SKIPPED_RESUME_IDS = {"6870436"}
+
+RawRow = Tuple[str, Dict[str, str], Optional[str]]
+
+def _iter_raw_rows_lxml(html: str) -> Iterator[RawRow]:
+    """(row id, span texts by column, first profile href) per resume row, one walk per row"""
+    try:
+        document = lxml_html.document_fromstring(html)
+    except (etree.ParserError, ValueError):
+        return
+    
+    for tr in document.iter("tr"):
+        row_id = tr.get("id") or ""
+        if not row_id.startswith("trBody_"):
+            continue
+        
+        fields: Dict[str, str] = {}
+        href: Optional[str] = None
+        for el in tr.iter("span", "a"):
+            if el.tag == "a":
+                if href is None and "/resume/" in (el.get("href") or ""):
+                    href = el.get("href")
+                continue
+            span_id = el.get("id")
+            if not span_id:
+                continue
+            for fragment, column in ROW_SPAN_FIELDS:
+                if column not in fields and fragment in span_id:
+                    fields[column] = "".join(text.strip() for text in el.itertext())
+        yield row_id, fields, href
+
+def _iter_raw_rows_bs4(html: str) -> Iterator[RawRow]:
+    """Same as _iter_raw_rows_lxml on BeautifulSoup's html.parser, for installs without lxml"""
+    soup = BeautifulSoup(html, "html.parser")
+    for tr in soup.find_all("tr", id=True):
+        row_id = tr.get("id", "")
+        if not row_id.startswith("trBody_"):
+            continue
+        
+        fields: Dict[str, str] = {}
+        href: Optional[str] = None
+        for el in tr.find_all(["span", "a"]):
+            if el.name == "a":
+                if href is None and "/resume/" in (el.get("href") or ""):
+                    href = el.get("href")
+                continue
+            span_id = el.get("id")
+            if not span_id:
+                continue
+            for fragment, column in ROW_SPAN_FIELDS:
+                if column not in fields and fragment in span_id:
+                    fields[column] = el.get_text(strip=True)
+        yield row_id, fields, href
+
+iter_raw_rows = _iter_raw_rows_lxml if lxml_html is not None else _iter_raw_rows_bs4
+
+def is_jobthai_url(url: str) -> bool:
+    """Whether url is on the JobThai site (JOBTHAI_BASE_URL), the only host the session cookies may be sent to"""
+    parts = urlsplit(url)
+    base = urlsplit(JOBTHAI_BASE_URL)
+    return (
+        parts.scheme == base.scheme and
+        parts.netloc.lower() == base.netloc.lower() and
+        parts.path.startswith(base.path + "/")
+    )
+
+def build_resume_record(resume_id: str, fields: Dict[str, str], href: Optional[str]) -> Dict[str, str]:
+    """CSV record from one row's raw span texts and profile link"""
+    def value(column: str) -> str:
+        return clean_text(fields.get(column, "-"))
+    
+    if href:
+        # Clean the URL by removing all whitespace
+        profile_url = clean_url(href.strip())
+        # Ensure it's a complete URL
+        if not profile_url.startswith('http'):
+            profile_url = JOBTHAI_BASE_URL + profile_url
+    else:
+        profile_url = "-"
+    
+    return {
+        "ลำดับ": clean_text(fields.get("ลำดับ", "-").replace(".", "")),
+        "เรซูเม่ ID": resume_id,
+        "คะแนน": value("คะแนน"),
+        "อายุ": value("อายุ"),
+        "ตำแหน่งที่สมัคร": value("ตำแหน่งที่สมัคร"),
+        "จังหวัด": value("จังหวัด"),
+        "เงินเดือน": value("เงินเดือน"),
+        "ระดับการศึกษา": value("ระดับการศึกษา"),
+        "สาขา": value("สาขา"),
+        "มหาวิทยาลัย": value("มหาวิทยาลัย"),
+        "ตำแหน่งที่เคยทำ": value("ตำแหน่งที่เคยทำ"),
+        "อัปเดตล่าสุด": value("อัปเดตล่าสุด"),
+        "ลิงก์โปรไฟล์": profile_url,
+    }
+
+def parse_resume_page(html: str) -> Tuple[List[Dict[str, str]], int]:
     """
-    Scrape resume data from JobThai and save to CSV
-    Returns the path to the saved CSV file
+    Parse one resume_list.php page into resume records
+    Each tr[id^='trBody_'] row is walked once, dispatching every span on the
+    fragment in its id (lxml when installed, else html.parser).
+    Returns the records and how many resume rows were skipped (ignored or
+    missing IDs, rows that failed to parse)
     """
-    cookie_string = f"PHPSESSID={phpsessid}; guestID={guest_id}; FCNEC={fcnec};"
+    rows: List[Dict[str, str]] = []
+    skipped = 0
     
-    base_url = "https://www3.jobthai.com/findresume/resume_list.php?&search-section=pagination&StepSearch=1&search=Y&jobtype=Computer&level=1&region=&KeyWord=&fieldsearch=All&p={page}&search-section=pagination"
+    for row_id, fields, href in iter_raw_rows(html):
+        try:
+            resume_id = row_id.split("_")[-1]
+            if resume_id and resume_id not in SKIPPED_RESUME_IDS:
+                rows.append(build_resume_record(resume_id, fields, href))
+            else:
+                skipped += 1
+        
+        except Exception as e:
+            print(f"❌ Error processing row {row_id}: {e}")
+            skipped += 1
+            continue
     
-    headers = {
+    return rows, skipped
+
+def parse_resume_rows(html: str) -> List[Dict[str, str]]:
+    """Resume records of one resume_list.php page (an empty list when it has none)"""
+    return parse_resume_page(html)[0]
+
+def _timed_parse(html: str) -> Tuple[List[Dict[str, str]], int, float]:
+    started = time.perf_counter()
+    rows, skipped = parse_resume_page(html)
+    return rows, skipped, time.perf_counter() - started
+
+def jobthai_headers(phpsessid: str, guest_id: str, fcnec: str) -> Dict[str, str]:
+    """Browser-like headers carrying the recruiter's JobThai session cookies"""
+    return {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Cookie": cookie_string
+        "Cookie": f"PHPSESSID={phpsessid}; guestID={guest_id}; FCNEC={fcnec};"
     }
+
+def make_jobthai_client(phpsessid: str, guest_id: str, fcnec: str, concurrency: int = MAX_CONCURRENT_PAGES) -> httpx.AsyncClient:
+    """Pooled keep-alive client: one connection per in-flight page, reused across pages"""
+    return httpx.AsyncClient(
+        headers=jobthai_headers(phpsessid, guest_id, fcnec),
+        timeout=REQUEST_TIMEOUT,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    )
+
+class PageFetchError(Exception):
+    """A result page could not be fetched"""
+
+
+class PageRejectedError(PageFetchError):
+    """JobThai refused a page outright (e.g. 403 for expired cookies); retrying or skipping will not help"""
+
+
+class ScrapeResult:
+    """
+    Outcome of one scrape: the saved CSV, the listing pages that could not
+    be fetched (as SearchQuery.key() -> {page: error}) and the scrape's
+    fetch / parse metrics
+    """
+
+    def __init__(
+        self,
+        csv_path: str,
+        row_count: int,
+        failed_pages: Optional[Dict[str, Dict[int, str]]] = None,
+        metrics: Optional[ScrapeMetrics] = None
+    ):
+        self.csv_path = csv_path
+        self.row_count = row_count
+        self.failed_pages = failed_pages or {}
+        self.metrics = metrics
+
+    @property
+    def complete(self) -> bool:
+        return not self.failed_pages
+
+    def to_dict(self) -> Dict:
+        return {
+            "csv_file": self.csv_path,
+            "rows": self.row_count,
+            "failed_pages": {key: sorted(pages) for key, pages in self.failed_pages.items()},
+            "metrics": self.metrics.to_dict() if self.metrics is not None else None
+        }
+
+
+async def aiter_jobthai_pages(
+    phpsessid: str,
+    guest_id: str,
+    fcnec: str,
+    max_pages: int = 50,
+    concurrency: int = MAX_CONCURRENT_PAGES,
+    rate_limiter: Optional[TokenBucket] = None,
+    initial_window: Optional[int] = None,
+    start_page: int = 1,
+    raise_on_error: bool = False,
+    page_cache: Optional[RawPageCache] = None,
+    replay: bool = False,
+    replay_as_of: Optional[float] = None,
+    failures: Optional[Dict[int, str]] = None,
+    retries: int = PAGE_RETRIES,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    query: SearchQuery = DEFAULT_SEARCH,
+    metrics: Optional[ScrapeMetrics] = None
+) -> AsyncIterator[Tuple[int, List[Dict[str, str]]]]:
+    """
+    Scrape one JobThai search listing with up to `concurrency` pages in flight
+    Requests are paced by the shared token bucket instead of a fixed sleep,
+    each page is parsed (in a worker thread) as soon as it arrives, and
+    (page_number, rows) are yielded strictly in page order. Stops at the first
+    failed or empty page; pages fetched ahead of it are discarded.
+    Connection errors, 429 and 5xx responses are retried up to `retries` times
+    with jittered exponential backoff. Every request goes through the shared
+    circuit breaker: while it is open no request is sent and the scrape stops.
+    With a failures dict, a page still failing after its retries is recorded
+    there (page -> error) and skipped instead of ending the listing. Any
+    other status (401/403 for expired cookies, ...) is not retried or
+    skipped: it raises PageRejectedError, with or without raise_on_error,
+    and 401/403 count as circuit breaker failures.
+    initial_window < concurrency starts with fewer pages in flight and doubles
+    the window per page yielded, for callers that expect to stop early.
+    start_page skips pages a resumed scrape already has. With raise_on_error a
+    failed page raises PageFetchError instead of ending the listing quietly.
+    Every page fetched is stored in page_cache when given. replay parses the
+    cached pages (as of replay_as_of, default newest) instead of fetching
+    anything; the listing ends at the first page missing from the cache.
+    Every page consumed (parsed, empty or failed) is recorded in metrics:
+    time in client.get over all attempts, response bytes, parse time in the
+    worker thread, and rows extracted and skipped. Pages fetched ahead and
+    discarded are not.
+    """
+    if replay and page_cache is None:
+        raise ValueError("replay needs a page_cache")
+    limiter = rate_limiter or jobthai_rate_limiter
+    breaker = circuit_breaker or jobthai_circuit_breaker
+    window = min(initial_window or concurrency, concurrency)
     
-    all_data: List[Dict[str, str]] = []
-    
-    print(f"🔍 Starting JobThai scraper for {max_pages} pages...")
+    if replay:
+        print(f"📼 Replaying up to {max_pages} cached JobThai pages...")
+    else:
+        print(f"🔍 Starting JobThai scraper for {max_pages} pages ({concurrency} concurrent)...")
     
-    for page in range(1, max_pages + 1):
-        url = base_url.format(page=page)
-        print(f"📄 Scraping page {page}/{max_pages}...")
+    client_context = nullcontext() if replay else make_jobthai_client(phpsessid, guest_id, fcnec, concurrency)
+    async with client_context as client:
         
-        try:
-            res = requests.get(url, headers=headers, timeout=15)
-            
-            if res.status_code != 200:
-                print(f"❌ Failed to fetch page {page} (Status: {res.status_code})")
-                break
-            
-            soup = BeautifulSoup(res.text, "html.parser")
-            resumes = soup.select("tr[id^='trBody_']")
-            
-            if not resumes:
-                print(f"⛔ No resumes found on page {page}")
-                break
+        page_metrics: Dict[int, PageMetrics] = {}
+        
+        async def parse_page(html: str, stats: PageMetrics) -> List[Dict[str, str]]:
+            rows, stats.rows_skipped, stats.parse_seconds = await asyncio.to_thread(_timed_parse, html)
+            stats.rows_extracted = len(rows)
+            return rows
+        
+        async def fetch_page(page: int) -> List[Dict[str, str]]:
+            url = query.url(page)
+            stats = page_metrics[page] = PageMetrics(query.key(), page)
+            if replay:
+                started = time.perf_counter()
+                html = await asyncio.to_thread(page_cache.get, url, replay_as_of)
+                stats.fetch_seconds = time.perf_counter() - started
+                if html is None:
+                    print(f"📭 Page {page} is not in the page cache")
+                    return []
+                stats.response_bytes = len(html.encode("utf-8"))
+                return await parse_page(html, stats)
             
-            for row in resumes:
+            for attempt in range(retries + 1):
+                breaker.check()
+                await limiter.acquire()
+                print(f"📄 Scraping page {page}/{max_pages}...")
+                retry_after = 0.0
+                stats.attempts += 1
+                started = time.perf_counter()
                 try:
-                    row_id = row.get("id", "")
-                    resume_id = row_id.split("_")[-1] if "_" in row_id else ""
-                    
-                    def safe_text(selector):
-                        el = row.select_one(selector)
-                        return el.get_text(strip=True) if el else "-"
-                    
-                    score = clean_text(safe_text("span[id*='resumeRankingPercent']"))
-                    age = clean_text(safe_text("span[id*='text-age']"))
-                    position = clean_text(safe_text("span[id*='positionValue']"))
-                    last_update = clean_text(safe_text("span[id*='lastUpdateValue']"))
-                    province = clean_text(safe_text("span[id*='addressValue']"))
-                    salary = clean_text(safe_text("span[id*='salaryValue']"))
-                    degree = clean_text(safe_text("span[id*='grad1LevelValue']"))
-                    field = clean_text(safe_text("span[id*='grad1FieldValue']"))
-                    university = clean_text(safe_text("span[id*='grad1SchoolValue']"))
-                    experience = clean_text(safe_text("span[id*='workExperienceValue']"))
-                    order = clean_text(safe_text("span[id*='text-no']").replace(".", ""))
-                    
-                    profile_link = row.select_one("a[href*='/resume/']")
-                    if profile_link and profile_link.get("href"):
-                        # Get raw href and clean it
-                        raw_url = profile_link["href"].strip()
-                        # Clean the URL by removing all whitespace
-                        profile_url = clean_url(raw_url)
-                        # Ensure it's a complete URL
-                        if not profile_url.startswith('http'):
-                            profile_url = "https://www3.jobthai.com" + profile_url
-                    else:
-                        profile_url = "-"
-                    
-                    if resume_id and resume_id != "6870436":
-                        all_data.append({
-                            "ลำดับ": order,
-                            "เรซูเม่ ID": resume_id,
-                            "คะแนน": score,
-                            "อายุ": age,
-                            "ตำแหน่งที่สมัคร": position,
-                            "จังหวัด": province,
-                            "เงินเดือน": salary,
-                            "ระดับการศึกษา": degree,
-                            "สาขา": field,
-                            "มหาวิทยาลัย": university,
-                            "ตำแหน่งที่เคยทำ": experience,
-                            "อัปเดตล่าสุด": last_update,
-                            "ลิงก์โปรไฟล์": profile_url,
-                        })
+                    res = await client.get(url)
+                except httpx.TransportError as e:
+                    stats.fetch_seconds += time.perf_counter() - started
+                    error = PageFetchError(f"Connection error at page {page}: {e}")
+                else:
+                    stats.fetch_seconds += time.perf_counter() - started
+                    stats.response_bytes += len(res.content)
+                    if res.status_code == 200:
+                        breaker.record_success()
+                        if page_cache is not None:
+                            await asyncio.to_thread(page_cache.put, url, res.text)
+                        return await parse_page(res.text, stats)
+                    if res.status_code not in RETRYABLE_STATUS_CODES:
+                        if res.status_code in REJECTED_SESSION_STATUS_CODES:
+                            # The cookies are shared by every query and profile fetch
+                            breaker.record_failure()
+                        raise PageRejectedError(f"JobThai rejected page {page} (Status: {res.status_code})")
+                    error = PageFetchError(f"Failed to fetch page {page} (Status: {res.status_code})")
+                    retry_after_header = res.headers.get("Retry-After", "")
+                    retry_after = float(retry_after_header) if retry_after_header.isdigit() else 0.0
                 
-                except Exception as e:
-                    print(f"❌ Error processing row {row_id}: {e}")
-                    continue
-            
-            print(f"✅ Page {page}: {len(resumes)} resumes (Total: {len(all_data)})")
-            time.sleep(1.5)
+                breaker.record_failure()
+                if attempt < retries:
+                    delay = max(backoff_delay(attempt, RETRY_BASE_DELAY, RETRY_MAX_DELAY), retry_after)
+                    print(f"🔁 {error}, retrying in {delay:.1f}s ({attempt + 1}/{retries})")
+                    await asyncio.sleep(delay)
+            raise error
+        
+        def record_page(page: int, error: Optional[Exception] = None) -> None:
+            stats = page_metrics.pop(page, None)
+            if metrics is not None and stats is not None:
+                stats.error = str(error) if error is not None else None
+                metrics.record(stats)
+        
+        in_flight: Dict[int, asyncio.Task] = {}
+        next_page = start_page
+        total = 0
+        
+        try:
+            for page in range(start_page, max_pages + 1):
+                while next_page <= max_pages and len(in_flight) < window:
+                    in_flight[next_page] = asyncio.create_task(fetch_page(next_page))
+                    next_page += 1
+                
+                try:
+                    rows = await in_flight.pop(page)
+                except CircuitOpenError as e:
+                    print(f"🛑 Stopping at page {page}: {e}")
+                    record_page(page, e)
+                    if raise_on_error:
+                        raise PageFetchError(f"Stopped at page {page}: {e}") from e
+                    break
+                except PageRejectedError as e:
+                    print(f"⛔ {e}")
+                    record_page(page, e)
+                    raise
+                except (PageFetchError, httpx.HTTPError) as e:
+                    if isinstance(e, httpx.HTTPError):
+                        e = PageFetchError(f"Connection error at page {page}: {e}")
+                    print(f"❌ {e}")
+                    record_page(page, e)
+                    if failures is not None:
+                        failures[page] = str(e)
+                        continue
+                    if raise_on_error:
+                        raise e
+                    break
+                
+                record_page(page)
+                if not rows:
+                    print(f"⛔ No resumes found on page {page}")
+                    break
+                
+                total += len(rows)
+                print(f"✅ Page {page}: {len(rows)} resumes (Total: {total})")
+                yield page, rows
+                window = min(window * 2, concurrency)
         
-        except requests.RequestException as e:
-            print(f"❌ Connection error at page {page}: {e}")
-            break
-    
-    # Save to CSV
-    if all_data:
-        filename = os.path.join(os.getcwd(), "jobthai_resumes.csv")
-        with open(filename, "w", newline="", encoding="utf-8-sig") as f:
-            writer = csv.DictWriter(f, fieldnames=all_data[0].keys())
-            writer.writeheader()
-            writer.writerows(all_data)
-        print(f"🎉 Saved {len(all_data)} resumes to {filename}")
-        return filename
+        finally:
+            for task in in_flight.values():
+                task.cancel()
+            await asyncio.gather(*in_flight.values(), return_exceptions=True)
+
+async def aiter_search_pages(
+    phpsessid: str,
+    guest_id: str,
+    fcnec: str,
+    queries: List[SearchQuery],
+    max_pages: int = 50,
+    start_pages: Optional[Dict[SearchQuery, int]] = None,
+    failures: Optional[Dict[SearchQuery, Dict[int, str]]] = None,
+    stopped: Optional[Set[SearchQuery]] = None,
+    **page_kwargs
+) -> AsyncIterator[Tuple[SearchQuery, int, List[Dict[str, str]]]]:
+    """
+    Page through several search listings at once
+    Every query runs its own aiter_jobthai_pages (same rate limiter, circuit
+    breaker and page_kwargs), and all of them fetch ahead concurrently;
+    (query, page_number, rows) are yielded round-robin (page 1 of every
+    query, then page 2, ...) so the merged order does not depend on timing.
+    A listing ends on its own; adding a query to `stopped` ends it early.
+    start_pages and failures are per query, as in aiter_jobthai_pages.
+    The same resume may appear under several queries; deduplicating is up
+    to the caller.
+    """
+    stopped = stopped if stopped is not None else set()
+    iterators = {
+        query: aiter_jobthai_pages(
+            phpsessid, guest_id, fcnec, max_pages,
+            start_page=(start_pages or {}).get(query, 1),
+            failures=failures.setdefault(query, {}) if failures is not None else None,
+            query=query,
+            **page_kwargs
+        )
+        for query in queries
+    }
+    pending = {query: asyncio.ensure_future(anext(pages)) for query, pages in iterators.items()}
+    
+    try:
+        while pending:
+            for query in list(pending):
+                try:
+                    page, rows = await pending.pop(query)
+                except StopAsyncIteration:
+                    continue
+                yield query, page, rows
+                if query not in stopped:
+                    pending[query] = asyncio.ensure_future(anext(iterators[query]))
+    
+    finally:
+        for task in pending.values():
+            task.cancel()
+        await asyncio.gather(*pending.values(), return_exceptions=True)
+        for pages in iterators.values():
+            await pages.aclose()
+
+async def scrape_jobthai_resumes_async(
+    phpsessid: str,
+    guest_id: str,
+    fcnec: str,
+    max_pages: int = 50,
+    filename: Optional[str] = None,
+    snapshot_store: Optional[SnapshotStore] = None,
+    corpus_store: Optional[ResumeCorpusStore] = None,
+    incremental: bool = False,
+    page_cache: Optional[RawPageCache] = None,
+    replay: bool = False,
+    queries: Optional[List[SearchQuery]] = None,
+    metrics: Optional[ScrapeMetrics] = None
+) -> ScrapeResult:
+    """
+    Scrape resume data from JobThai and save to CSV
+    queries are the searches to cover (default: DEFAULT_SEARCH), up to
+    max_pages each. They are fetched concurrently under the shared rate limit
+    (see aiter_search_pages) and merged into one CSV deduplicated by
+    เรซูเม่ ID, the first occurrence winning.
+    With a snapshot_store the result becomes a new versioned snapshot; otherwise it
+    is written to filename (default: jobthai_resumes.csv in the working directory).
+    Rows are appended to a .part file as each page completes, with a checkpoint
+    of the pages completed per query (see CheckpointedCsvWriter); the CSV only
+    appears under its final name once the scrape is done. A page still failing
+    after its retries is skipped and reported in ScrapeResult.failed_pages; if
+    the circuit breaker stops the scrape, the partial output is kept and
+    PageFetchError is raised: calling again with the same arguments within an
+    hour continues after the checkpointed pages.
+    With a corpus_store each page's rows are also upserted into the SQLite
+    corpus by เรซูเม่ ID as the page completes.
+    incremental (with a snapshot_store that has a current snapshot) stops each
+    query at its first page whose resumes all have the same อัปเดตล่าสุด as in
+    that snapshot, writes only the new or updated resumes, then the rest of
+    that snapshot.
+    Raw pages are archived in page_cache when given; replay re-derives the
+    corpus from that archive offline (the cookies are then unused).
+    Per-page fetch and parse metrics are collected in metrics (a new
+    ScrapeMetrics by default), along with the rows dropped as unchanged or
+    as duplicates across searches.
+    Scrapes into a snapshot_store hold its scrape_lock() (an OS file lock) from
+    staging to adopt, so worker processes never share the staging file or
+    resume each other's checkpoint; a second scrape waits for the first.
+    Returns a ScrapeResult with the path to the saved CSV file and the metrics
+    """
+    if snapshot_store is not None:
+        lock = snapshot_store.scrape_lock()
+        if not lock.held:
+            async with lock:
+                return await scrape_jobthai_resumes_async(
+                    phpsessid, guest_id, fcnec, max_pages,
+                    filename=filename,
+                    snapshot_store=snapshot_store,
+                    corpus_store=corpus_store,
+                    incremental=incremental,
+                    page_cache=page_cache,
+                    replay=replay,
+                    queries=queries,
+                    metrics=metrics
+                )
+    
+    queries = list(dict.fromkeys(queries or [DEFAULT_SEARCH]))
+    metrics = metrics if metrics is not None else ScrapeMetrics()
+    
+    previous: List[Dict[str, str]] = []
+    base_version = None
+    if incremental and snapshot_store is not None:
+        base_version = snapshot_store.current_version()
+        if base_version is not None:
+            previous = await asyncio.to_thread(snapshot_store.read_rows, base_version)
+    known = {row.get("เรซูเม่ ID"): row.get("อัปเดตล่าสุด") for row in previous}
+    if known:
+        print(f"🔁 Incremental scrape against {len(known)} known resumes")
+    
+    if snapshot_store is not None:
+        output_path = snapshot_store.staging_path()
     else:
-        raise Exception("No data scraped from JobThai")
\ No newline at end of file
+        output_path = filename or os.path.join(os.getcwd(), "jobthai_resumes.csv")
+    
+    writer = CheckpointedCsvWriter(
+        output_path,
+        params={
+            "search_urls": [query.url("{page}") for query in queries],
+            "max_pages": max_pages,
+            "base_version": base_version,
+            "replay": replay
+        },
+        key_field="เรซูเม่ ID"
+    )
+    pages_written = await asyncio.to_thread(writer.open)
+    # Checkpoint state is JSON: per-query progress is stored by query key, page numbers as strings
+    query_pages: Dict[str, int] = writer.state.setdefault("query_pages", {})
+    stored_failures = writer.state.get("failed_pages", {})
+    failed_pages = {
+        query: {int(page): error for page, error in stored_failures.get(query.key(), {}).items()}
+        for query in queries
+    }
+    if pages_written:
+        print(f"⏯️ Resuming after {pages_written} pages ({writer.row_count} resumes already saved)")
+    
+    stopped: Set[SearchQuery] = set()
+    pages = aiter_search_pages(
+        phpsessid, guest_id, fcnec, queries, max_pages,
+        start_pages={query: query_pages.get(query.key(), 0) + 1 for query in queries},
+        failures=failed_pages,
+        stopped=stopped,
+        initial_window=1 if known else None,
+        raise_on_error=True,
+        page_cache=page_cache,
+        replay=replay,
+        metrics=metrics
+    )
+    try:
+        async with aclosing(pages):
+            async for query, page, rows in pages:
+                writer.state["page_size"] = max(writer.state.get("page_size", 0), len(rows))
+                if known:
+                    changed = [row for row in rows if known.get(row["เรซูเม่ ID"]) != row["อัปเดตล่าสุด"]]
+                    metrics.rows_unchanged += len(rows) - len(changed)
+                    rows = changed
+                    if not rows:
+                        print(f"⏹️ Page {page} of {query.key()} has no new or updated resumes, stopping it")
+                        stopped.add(query)
+                        continue
+                query_pages[query.key()] = page
+                writer.state["failed_pages"] = {
+                    failed_query.key(): {str(failed): error for failed, error in failures.items()}
+                    for failed_query, failures in failed_pages.items() if failures
+                }
+                # Upsert before checkpointing, so a resumed scrape never skips a page's upsert
+                if corpus_store is not None:
+                    await asyncio.to_thread(corpus_store.upsert_rows, rows)
+                pages_written += 1
+                written = await asyncio.to_thread(writer.write_page, pages_written, rows)
+                metrics.rows_duplicate += len(rows) - written
+    except BaseException:
+        if writer.last_page:
+            # Keep the part file and checkpoint for the next attempt
+            writer.close()
+            print(f"💾 {writer.row_count} resumes from {writer.last_page} pages kept for resume")
+        else:
+            writer.discard()
+        raise
+    
+    # Only new or updated resumes were written so far; carry over the rest of the previous snapshot
+    if known:
+        print(f"🆕 {writer.row_count} new or updated resumes")
+        limit = max(writer.state.get("page_size", 0) * max_pages * len(queries), writer.row_count)
+        carried = [row for row in previous if row.get("เรซูเม่ ID") not in writer.seen_keys]
+        await asyncio.to_thread(writer.write_rows, carried[:max(limit - writer.row_count, 0)])
+    
+    if not writer.row_count:
+        writer.discard()
+        raise Exception("No data scraped from JobThai")
+    
+    filename = await asyncio.to_thread(writer.finish)
+    if snapshot_store is not None:
+        version = await asyncio.to_thread(snapshot_store.adopt, filename)
+        filename = snapshot_store.path_for(version)
+    failed_pages = {query.key(): failures for query, failures in failed_pages.items() if failures}
+    for key, failures in failed_pages.items():
+        print(f"⚠️ Pages {sorted(failures)} of {key} failed after retries and were skipped")
+    metrics.finish(writer.row_count)
+    print(f"⏱️ {metrics.summary()}")
+    print(f"🎉 Saved {writer.row_count} resumes to {filename}")
+    return ScrapeResult(filename, writer.row_count, failed_pages, metrics)
+
+def scrape_jobthai_resumes(
+    phpsessid: str,
+    guest_id: str,
+    fcnec: str,
+    max_pages: int = 50,
+    filename: Optional[str] = None,
+    snapshot_store: Optional[SnapshotStore] = None,
+    corpus_store: Optional[ResumeCorpusStore] = None,
+    incremental: bool = False,
+    page_cache: Optional[RawPageCache] = None,
+    replay: bool = False,
+    queries: Optional[List[SearchQuery]] = None,
+    metrics: Optional[ScrapeMetrics] = None
+) -> ScrapeResult:
+    """Blocking wrapper of scrape_jobthai_resumes_async for scripts and worker threads"""
+    return asyncio.run(scrape_jobthai_resumes_async(
+        phpsessid, guest_id, fcnec, max_pages,
+        filename=filename,
+        snapshot_store=snapshot_store,
+        corpus_store=corpus_store,
+        incremental=incremental,
+        page_cache=page_cache,
+        replay=replay,
+        queries=queries,
+        metrics=metrics
+    ))
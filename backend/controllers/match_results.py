@@ -0,0 +1,301 @@
+import base64
+import hashlib
+import heapq
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Total score from which a match counts as high quality
+HIGH_QUALITY_SCORE = 75.0
+
+
+class TopKSelector:
+    """
+    Streaming top-k by score with running aggregates
+    Keeps at most k entries in a min-heap (O(k) memory, O(n log k) time) while
+    counting, summing and tallying high-quality scores in the same pass. Among
+    equal scores the earlier pushed entry wins, matching a stable sort.
+    """
+
+    def __init__(self, k: int, high_quality_threshold: float = HIGH_QUALITY_SCORE):
+        self.k = k
+        self.high_quality_threshold = high_quality_threshold
+        self.count = 0
+        self.total = 0.0
+        self.high_quality_count = 0
+        self._heap: List[Tuple[float, int, Any]] = []
+
+    def push(self, score: float, item: Any) -> None:
+        seq = self.count
+        self.count += 1
+        self.total += score
+        if score >= self.high_quality_threshold:
+            self.high_quality_count += 1
+
+        # (score, -seq): the heap root is the lowest score, latest among ties
+        entry = (score, -seq, item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def results(self) -> List[Any]:
+        """Current top-k items, best first"""
+        return [item for _, _, item in sorted(self._heap, reverse=True, key=lambda e: (e[0], e[1]))]
+
+    def average_score(self) -> float:
+        return round(self.total / self.count, 2) if self.count else 0
+
+    def statistics(self) -> Dict[str, Any]:
+        return {
+            "total_resumes_scanned": self.count,
+            "average_score": self.average_score(),
+            "high_quality_matches": self.high_quality_count,
+            "top_matches_count": len(self._heap)
+        }
+
+
+class RankedResults:
+    """
+    A full ranking kept as per-row scores
+    The top k ranks come from np.argpartition plus a stable sort of the k
+    best (O(n + k log k)); the complete best-first order is only sorted the
+    first time someone pages past k. Result dicts are built by materialize(row_index) when
+    a rank is first read and cached afterwards, so only rows actually shown
+    pay for their details/resume_data payload.
+    totals may hold NaN for rows pruned as unable to reach the top k; they are
+    left out of the selection, and complete() must then return the totals
+    with every row scored before the full order is sorted. Pass statistics
+    when they cannot be derived from the known rows alone.
+    """
+
+    def __init__(
+        self,
+        totals: np.ndarray,
+        materialize: Callable[[int], Dict[str, Any]],
+        k: int = 20,
+        statistics: Optional[Dict[str, Any]] = None,
+        complete: Optional[Callable[[], np.ndarray]] = None
+    ):
+        self.scores = np.round(totals, 2)
+        self._materialize = materialize
+        self._complete = complete
+        self._cache: Dict[int, Dict[str, Any]] = {}
+
+        known = np.flatnonzero(~np.isnan(self.scores))
+        known_scores = self.scores[known]
+        self._top = self._select_top(known, known_scores, k)
+        if statistics is None:
+            statistics = {
+                "total_resumes_scanned": len(known),
+                "average_score": round(float(known_scores.sum()) / len(known), 2) if len(known) else 0,
+                "high_quality_matches": int((known_scores >= HIGH_QUALITY_SCORE).sum()),
+                "top_matches_count": len(self._top)
+            }
+        self.statistics = statistics
+        self._order: Optional[np.ndarray] = None
+        self._order_lock = threading.Lock()
+
+    @staticmethod
+    def _select_top(rows: np.ndarray, scores: np.ndarray, k: int) -> List[int]:
+        """The k best rows, best first; among equal scores the earlier row wins, as with a stable sort"""
+        k = min(k, len(rows))
+        if k <= 0:
+            return []
+        if k < len(rows):
+            # Every row scoring at least the k-th best, so ties at the cut keep row order
+            kth_score = scores[np.argpartition(-scores, k - 1)[k - 1]]
+            keep = scores >= kth_score
+            rows, scores = rows[keep], scores[keep]
+        return rows[np.argsort(-scores, kind="stable")[:k]].tolist()
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def _row_index(self, rank: int) -> int:
+        if rank < len(self._top):
+            return self._top[rank]
+        # Pages may be read from several threadpool workers at once
+        with self._order_lock:
+            if self._order is None:
+                if self._complete is not None and np.isnan(self.scores).any():
+                    self.scores = np.round(self._complete(), 2)
+                # Stable sort keeps corpus order among equal scores, same as the top k
+                self._order = np.argsort(-self.scores, kind="stable")
+        return int(self._order[rank])
+
+    def _result(self, rank: int) -> Dict[str, Any]:
+        result = self._cache.get(rank)
+        if result is None:
+            result = self._materialize(self._row_index(rank))
+            self._cache[rank] = result
+        return result
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self._result(rank) for rank in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("rank out of range")
+        return self._result(index)
+
+    def top(self) -> List[Dict[str, Any]]:
+        """The top-k results selected at construction, best first"""
+        return self[:len(self._top)]
+
+
+class MatchResultStore:
+    """
+    Keeps full match rankings in memory under a result ID
+    Least recently used rankings are evicted beyond max_results, and any
+    ranking older than ttl seconds is dropped, so browsing deeper pages is a
+    slice of a stored list instead of a re-scrape and re-score.
+    """
+
+    def __init__(self, max_results: int = 50, ttl: float = 60 * 60):
+        self.max_results = max_results
+        self.ttl = ttl
+        self._results: "OrderedDict[str, Tuple[float, Sequence[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def save(self, ranking: Sequence[Dict[str, Any]]) -> str:
+        """Store a ranking (a list or RankedResults, best first) and return its result ID"""
+        result_id = uuid.uuid4().hex
+        with self._lock:
+            self._results[result_id] = (time.time(), ranking)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return result_id
+
+    def get(self, result_id: str) -> Optional[Sequence[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._results.get(result_id)
+            if entry is None:
+                return None
+
+            created_at, ranking = entry
+            if time.time() - created_at > self.ttl:
+                del self._results[result_id]
+                return None
+
+            self._results.move_to_end(result_id)
+            return ranking
+
+
+class RankingCache:
+    """
+    Recently computed rankings keyed by what they were computed from
+    An entry is stored under (corpus, corpus version, request key). The first
+    lookup or store at a newer version of a corpus drops every entry of its
+    older versions, so a refreshed snapshot invalidates the cache without any
+    explicit call; rankings for an older version than the newest seen are
+    neither returned nor stored. Versions must sort in publication order.
+    Least recently used entries are evicted beyond max_entries, and entries
+    older than ttl seconds are never returned.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: float = 60 * 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, RankedResults]]" = OrderedDict()
+        self._versions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _is_current(self, corpus: str, version: str) -> bool:
+        """Track the newest version of corpus, dropping older entries when it moves"""
+        current = self._versions.get(corpus)
+        if current is not None and version < current:
+            return False
+        if version != current:
+            self._versions[corpus] = version
+            for key in [key for key in self._entries if key[0] == corpus and key[1] != version]:
+                del self._entries[key]
+        return True
+
+    def get(self, corpus: str, version: str, request_key: str) -> Optional[RankedResults]:
+        with self._lock:
+            if not self._is_current(corpus, version):
+                return None
+
+            key = (corpus, version, request_key)
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            created_at, ranking = entry
+            if time.time() - created_at > self.ttl:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return ranking
+
+    def put(self, corpus: str, version: str, request_key: str, ranking: RankedResults) -> None:
+        with self._lock:
+            if not self._is_current(corpus, version):
+                return
+
+            key = (corpus, version, request_key)
+            self._entries[key] = (time.time(), ranking)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def fingerprint(value: Any) -> str:
+    """SHA-256 of a JSON-serialisable value; dict key order does not matter"""
+    raw = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def encode_cursor(result_id: str, offset: int) -> str:
+    """Opaque cursor pointing at offset within a stored ranking"""
+    raw = f"{result_id}:{offset}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Inverse of encode_cursor, raises ValueError for malformed cursors"""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    result_id, offset = base64.urlsafe_b64decode(padded.encode()).decode().split(":")
+    offset_value = int(offset)
+    if offset_value < 0:
+        raise ValueError("Negative cursor offset")
+    return result_id, offset_value
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a fields= query value like "total_score,resume_data.id" """
+    if not fields:
+        return None
+    return [f.strip() for f in fields.split(",") if f.strip()]
+
+
+def project_result(result: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """
+    Keep only the requested (optionally dotted) fields of a match result
+    e.g. ["total_score", "details.salary", "resume_data.id"]
+    """
+    if not fields:
+        return result
+
+    projected: Dict[str, Any] = {}
+    for path in fields:
+        parts = path.split(".")
+        value: Any = result
+        for part in parts:
+            if not isinstance(value, dict) or part not in value:
+                break
+            value = value[part]
+        else:
+            target = projected
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+    return projected
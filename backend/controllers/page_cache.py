@@ -0,0 +1,91 @@
+import gzip
+import hashlib
+import os
+import tempfile
+import time
+from typing import List, Optional
+
+from controllers.corpus_snapshots import atomic_write_text
+
+PAGE_SUFFIX = ".html.gz"
+URL_FILE = "URL"
+
+
+class RawPageCache:
+    """
+    Gzipped archive of raw JobThai responses, keyed by URL and fetch time
+    Each URL gets a directory named after its SHA-256, holding the URL itself
+    and one <fetched_at in ms>.html.gz per fetch; the newest `retention`
+    fetches per URL are kept. Pages are written via temp file + rename, so
+    concurrent scrapes and replays never read a partial page.
+    get(url, as_of) returns the newest fetch at or before as_of, so a replay
+    can re-parse the listing exactly as it was scraped at some point in time.
+    """
+
+    def __init__(self, root_dir: Optional[str] = None, retention: int = 3):
+        self.root_dir = root_dir or os.path.join(os.getcwd(), "page_cache")
+        self.retention = retention
+
+    def _url_dir(self, url: str) -> str:
+        return os.path.join(self.root_dir, hashlib.sha256(url.encode("utf-8")).hexdigest())
+
+    def fetch_times(self, url: str) -> List[float]:
+        """Fetch times of every cached copy of url, oldest first"""
+        try:
+            names = os.listdir(self._url_dir(url))
+        except FileNotFoundError:
+            return []
+        return sorted(int(name[:-len(PAGE_SUFFIX)]) / 1000 for name in names if name.endswith(PAGE_SUFFIX))
+
+    def _page_path(self, url: str, fetched_at: float) -> str:
+        return os.path.join(self._url_dir(url), f"{int(round(fetched_at * 1000))}{PAGE_SUFFIX}")
+
+    def put(self, url: str, html: str, fetched_at: Optional[float] = None) -> str:
+        """Store one fetched page and prune older copies beyond retention. Returns its path"""
+        url_dir = self._url_dir(url)
+        os.makedirs(url_dir, exist_ok=True)
+        if not os.path.exists(os.path.join(url_dir, URL_FILE)):
+            atomic_write_text(os.path.join(url_dir, URL_FILE), url)
+
+        path = self._page_path(url, fetched_at if fetched_at is not None else time.time())
+        fd, tmp_path = tempfile.mkstemp(dir=url_dir, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(html.encode("utf-8"), compresslevel=6))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        for old in self.fetch_times(url)[:-self.retention]:
+            try:
+                os.unlink(self._page_path(url, old))
+            except FileNotFoundError:
+                pass
+        return path
+
+    def get(self, url: str, as_of: Optional[float] = None) -> Optional[str]:
+        """HTML of the newest cached fetch of url at or before as_of (None if there is none)"""
+        times = [t for t in self.fetch_times(url) if as_of is None or t <= as_of]
+        if not times:
+            return None
+        try:
+            with gzip.open(self._page_path(url, times[-1]), "rb") as f:
+                return f.read().decode("utf-8")
+        except FileNotFoundError:
+            # Pruned by a concurrent put
+            return None
+
+    def urls(self) -> List[str]:
+        """Every URL with at least one cached page"""
+        urls = []
+        if not os.path.isdir(self.root_dir):
+            return urls
+        for name in os.listdir(self.root_dir):
+            try:
+                with open(os.path.join(self.root_dir, name, URL_FILE), encoding="utf-8") as f:
+                    urls.append(f.read())
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+        return sorted(urls)
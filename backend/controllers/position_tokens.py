@@ -0,0 +1,93 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from pythainlp import word_tokenize
+
+from controllers.corpus_store import ResumeCorpusStore
+
+# Bump when tokenize_position_text changes so persisted token lists are not reused
+TOKENIZER_VERSION = "newmm-1"
+
+THAI_CHAR_PATTERN = re.compile(r'[\u0e00-\u0e7f]')
+LATIN_TOKEN_PATTERN = re.compile(r'\w\w+')
+
+
+def tokenize_position_text(text: str) -> List[str]:
+    """
+    Segment position/experience text into words
+    Thai runs are split with pythainlp (newmm), so "โปรแกรมเมอร์PHP" becomes
+    ["โปรแกรมเมอร์", "php"]; non-Thai pieces follow TfidfVectorizer's default
+    token pattern (2+ word characters), which drops punctuation like "(" or ",".
+    """
+    tokens: List[str] = []
+    for word in word_tokenize(text.lower(), engine="newmm", keep_whitespace=False):
+        if THAI_CHAR_PATTERN.search(word):
+            tokens.append(word)
+        else:
+            tokens.extend(LATIN_TOKEN_PATTERN.findall(word))
+    return tokens
+
+
+def pretokenized(tokens: List[str]) -> List[str]:
+    """Identity preprocessor/tokenizer for vectorizers fed token lists"""
+    return tokens
+
+
+class PositionTokenCache:
+    """
+    Token lists of position texts, segmented once per distinct text
+    Lists are kept in an in-memory LRU and persisted in the corpus store
+    (position_tokens table), keyed by a hash of the tokenizer version and the
+    text, so a resume is segmented once no matter how many snapshots, workers
+    or matches it appears in.
+    """
+
+    def __init__(
+        self,
+        store_factory: Optional[Callable[[], ResumeCorpusStore]] = None,
+        max_entries: int = 200_000
+    ):
+        self.store_factory = store_factory
+        self.max_entries = max_entries
+        self._tokens: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def text_key(text: str) -> str:
+        return hashlib.sha1(f"{TOKENIZER_VERSION}\0{text}".encode("utf-8")).hexdigest()
+
+    def tokenize_many(self, texts: List[str]) -> List[List[str]]:
+        keys = [self.text_key(text) for text in texts]
+        found: Dict[str, List[str]] = {}
+
+        with self._lock:
+            for key in keys:
+                tokens = self._tokens.get(key)
+                if tokens is not None:
+                    self._tokens.move_to_end(key)
+                    found[key] = tokens
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in found}
+        if missing and self.store_factory is not None:
+            stored = self.store_factory().load_tokens(list(missing))
+            found.update(stored)
+            for key in stored:
+                del missing[key]
+
+        if missing:
+            segmented = {key: tokenize_position_text(text) for key, text in missing.items()}
+            if self.store_factory is not None:
+                self.store_factory().save_tokens(segmented)
+            found.update(segmented)
+
+        with self._lock:
+            for key, tokens in found.items():
+                self._tokens[key] = tokens
+                self._tokens.move_to_end(key)
+            while len(self._tokens) > self.max_entries:
+                self._tokens.popitem(last=False)
+
+        return [found[key] for key in keys]
@@ -0,0 +1,162 @@
+import asyncio
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from bs4 import BeautifulSoup
+
+from controllers.corpus_store import ResumeCorpusStore
+from controllers.jobthai_scraper import (
+    REJECTED_SESSION_STATUS_CODES,
+    PageFetchError,
+    is_jobthai_url,
+    jobthai_circuit_breaker,
+    jobthai_rate_limiter,
+    make_jobthai_client
+)
+from controllers.rate_limit import CircuitBreaker, TokenBucket
+
+# Profile pages fetched at once; they share the listing's rate limit
+PROFILE_CONCURRENCY = 4
+
+# (resume_id, last_update, profile_url) of one list candidate
+ProfileRef = Tuple[str, str, str]
+
+
+def profile_text(html: str) -> str:
+    """Visible text of a profile page, one non-empty block per line"""
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    lines = (re.sub(r"\s+", " ", line).strip() for line in soup.get_text("\n").splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def analyze_profile_text(analyzer: Any, text: str) -> Dict[str, Any]:
+    """Run the ThaiResumeAnalyzer extractors that apply to a JobThai profile page"""
+    work_experience = analyzer.extract_work_experience(text)
+    return {
+        "desired_position": analyzer.extract_desired_position(text),
+        "expected_salary_details": analyzer.extract_expected_salary(text),
+        "skills": analyzer.clean_skills_dict(analyzer.extract_skills_detailed(text)),
+        "education": analyzer.clean_education_list(analyzer.extract_education(text)),
+        "work_experience": analyzer.clean_work_experience_list(work_experience),
+        "total_experience": analyzer.calculate_total_experience(work_experience),
+        "language_skills": analyzer.clean_language_skills_list(analyzer.extract_language_skills(text)),
+        "certifications": analyzer.clean_certifications_list(analyzer.extract_certifications(text))
+    }
+
+
+class ProfileEnricher:
+    """
+    Profile-page details for the top list candidates
+    The list page only carries a short summary per resume. enrich() fetches
+    the profile pages of the given candidates (at most `concurrency` at once,
+    through the JobThai rate limiter and circuit breaker), extracts their
+    text and runs it through ThaiResumeAnalyzer's extractors in a worker
+    thread. Results are persisted in the corpus store (resume_profiles table)
+    by resume ID and last-update date, and concurrent requests for the same
+    profile share one fetch, so each profile version is fetched and analyzed
+    once. A profile that cannot be fetched is left out and tried again on a
+    later call.
+    """
+
+    def __init__(
+        self,
+        store_factory: Optional[Callable[[], ResumeCorpusStore]] = None,
+        analyzer_factory: Optional[Callable[[], Any]] = None,
+        concurrency: int = PROFILE_CONCURRENCY,
+        rate_limiter: Optional[TokenBucket] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None
+    ):
+        self.store_factory = store_factory
+        self.analyzer_factory = analyzer_factory
+        self.concurrency = concurrency
+        self.rate_limiter = rate_limiter or jobthai_rate_limiter
+        self.circuit_breaker = circuit_breaker or jobthai_circuit_breaker
+        self._analyzer = None
+        self._analyzer_lock = threading.Lock()
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    @property
+    def analyzer(self) -> Any:
+        """ThaiResumeAnalyzer, created on first use (it loads OCR and NLP resources)"""
+        with self._analyzer_lock:
+            if self._analyzer is None:
+                if self.analyzer_factory is None:
+                    from controllers.resume_analyzer import ThaiResumeAnalyzer
+                    self.analyzer_factory = ThaiResumeAnalyzer
+                self._analyzer = self.analyzer_factory()
+            return self._analyzer
+
+    def analyze_html(self, html: str) -> Dict[str, Any]:
+        return analyze_profile_text(self.analyzer, profile_text(html))
+
+    async def enrich(self, candidates: List[ProfileRef], phpsessid: str, guest_id: str, fcnec: str) -> Dict[str, Dict[str, Any]]:
+        """Enriched profile per resume ID for the candidates that have a profile link on JobThai"""
+        # The client carries the session cookies, so links to any other host are never followed
+        candidates = [ref for ref in candidates if ref[0] and is_jobthai_url(ref[2])]
+        keys = [(resume_id, last_update) for resume_id, last_update, _ in candidates]
+
+        profiles: Dict[str, Dict[str, Any]] = {}
+        if keys and self.store_factory is not None:
+            profiles = await asyncio.to_thread(self.store_factory().load_profiles, keys)
+        missing = [ref for ref in candidates if ref[0] not in profiles]
+        if not missing:
+            return profiles
+
+        loop = asyncio.get_running_loop()
+        owned: Dict[Tuple[str, str], ProfileRef] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        for ref in missing:
+            key = (ref[0], ref[1])
+            future = self._in_flight.get(key)
+            if future is None:
+                future = loop.create_future()
+                self._in_flight[key] = future
+                owned[key] = ref
+            waiting[ref[0]] = future
+
+        if owned:
+            print(f"🔎 Enriching {len(owned)} profiles ({self.concurrency} concurrent)...")
+            semaphore = asyncio.Semaphore(self.concurrency)
+            fetched: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+            async with make_jobthai_client(phpsessid, guest_id, fcnec, self.concurrency) as client:
+
+                async def fetch_profile(key: Tuple[str, str], url: str) -> None:
+                    future = self._in_flight[key]
+                    try:
+                        async with semaphore:
+                            self.circuit_breaker.check()
+                            await self.rate_limiter.acquire()
+                            res = await client.get(url)
+                        if res.status_code != 200:
+                            if res.status_code >= 500 or res.status_code in REJECTED_SESSION_STATUS_CODES:
+                                self.circuit_breaker.record_failure()
+                            raise PageFetchError(f"Failed to fetch profile {key[0]} (Status: {res.status_code})")
+                        self.circuit_breaker.record_success()
+                        profile = await asyncio.to_thread(self.analyze_html, res.text)
+                        fetched[key] = profile
+                        future.set_result(profile)
+                    except Exception as e:
+                        if isinstance(e, httpx.TransportError):
+                            self.circuit_breaker.record_failure()
+                        print(f"⚠️ Profile {key[0]} not enriched: {e}")
+                        future.set_result(None)
+                    finally:
+                        if not future.done():
+                            future.cancel()
+                        self._in_flight.pop(key, None)
+
+                await asyncio.gather(*(fetch_profile(key, ref[2]) for key, ref in owned.items()))
+
+            if fetched and self.store_factory is not None:
+                await asyncio.to_thread(self.store_factory().save_profiles, fetched)
+
+        for resume_id, future in waiting.items():
+            profile = await future
+            if profile is not None:
+                profiles[resume_id] = profile
+        return profiles
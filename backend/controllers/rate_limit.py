@@ -0,0 +1,132 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Optional, Tuple
+
+from controllers.corpus_snapshots import ScrapeLock
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter shared by every scrape in the process
+    Tokens refill continuously at `rate` per second up to `capacity`, so up
+    to `capacity` requests may go out back to back while the long-run rate
+    never exceeds `rate`. A request that finds the bucket empty reserves the
+    next token (the count goes negative) and sleeps until it is due, so
+    waiters are served in arrival order. Reservations are taken under a
+    thread lock, which keeps the bucket usable from any event loop or thread.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token, returning how many seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    TokenBucket kept in a file, shared by every worker process
+    Each reservation reads and rewrites the token count under an OS file
+    lock (a ScrapeLock on path + ".lock"), so the workers of one deployment
+    together stay within `rate` instead of each sending `rate` on its own.
+    Times are wall clock, as monotonic clocks differ between processes; a
+    missing or unreadable state file counts as a full bucket.
+    """
+
+    def __init__(self, path: str, rate: float, capacity: float = 1.0):
+        super().__init__(rate, capacity)
+        self.path = path
+        self._file_lock = ScrapeLock(path + ".lock")
+
+    def _load(self, now: float) -> Tuple[float, float]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                tokens, updated = (float(value) for value in f.read().split())
+        except (OSError, ValueError):
+            return self.capacity, now
+        return tokens, updated
+
+    def reserve(self) -> float:
+        with self._lock:
+            self._file_lock.acquire()
+            try:
+                now = time.time()
+                tokens, updated = self._load(now)
+                tokens = min(self.capacity, tokens + max(now - updated, 0.0) * self.rate) - 1
+                with open(self.path, "w", encoding="utf-8") as f:
+                    f.write(f"{tokens!r} {now!r}")
+            finally:
+                self._file_lock.release()
+        return 0.0 if tokens >= 0 else -tokens / self.rate
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2^attempt)]"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Stops requests to a host that keeps failing
+    After failure_threshold consecutive failures the circuit opens and
+    check() raises CircuitOpenError for reset_timeout seconds. After that
+    requests go through again (half-open): the first success closes the
+    circuit, the first failure opens it again for another reset_timeout.
+    Shared across threads and event loops like TokenBucket.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def check(self) -> None:
+        """Raise CircuitOpenError unless a request may be sent now"""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if remaining > 0:
+                raise CircuitOpenError(
+                    f"Circuit open after {self._failures} consecutive failures (retry in {remaining:.0f}s)"
+                )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            # Half-open (opened before and timed out): one failure is enough
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
@@ -0,0 +1,144 @@
+import csv
+import hashlib
+import json
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from controllers.candidate_index import CandidateIndex
+from controllers.position_tokens import TOKENIZER_VERSION
+
+# Education level code for rows whose level is not recognised
+NO_EDUCATION_LEVEL = -1
+
+# Typed columns of a ResumeCorpus, in storage order
+COLUMN_NAMES = (
+    "salary_min",
+    "salary_max",
+    "education_level",
+    "field_relevant",
+    "province_mask",
+    "experience_missing",
+    "experience_has_years",
+    "position_mask",
+)
+
+
+def position_text_of(row: Dict[str, str]) -> str:
+    """Lowercased "position experience" text the position factor is scored on"""
+    return f"{row.get('ตำแหน่งที่สมัคร', '')} {row.get('ตำแหน่งที่เคยทำ', '')}".lower()
+
+
+class ResumeCorpus:
+    """
+    Scraped resumes loaded once into typed columns
+    The raw rows are kept for building response payloads; everything the
+    vectorised scorers need is parsed up front into NumPy arrays:
+      salary_min / salary_max  int64 salary range ("15, 000" -> 15000)
+      education_level          int8 level code (points of the matched level, -1 if none)
+      field_relevant           bool, field of study is IT related
+      province_mask            int64 bitmask of matcher.thai_provinces found in the province
+      experience_missing       bool, no previous position ("" or "-")
+      experience_has_years     bool, previous position mentions years (ปี / year)
+      position_mask            int64 bitmask of matcher.position_terms found in the
+                               lowercased "position experience" text
+    plus a CandidateIndex (inverted TF-IDF index) over that same text.
+    """
+
+    def __init__(self, rows: Sequence[Dict[str, str]], columns: Dict[str, np.ndarray], index: CandidateIndex):
+        self.rows = rows
+        self.index = index
+        self.salary_min = columns["salary_min"]
+        self.salary_max = columns["salary_max"]
+        self.education_level = columns["education_level"]
+        self.field_relevant = columns["field_relevant"]
+        self.province_mask = columns["province_mask"]
+        self.experience_missing = columns["experience_missing"]
+        self.experience_has_years = columns["experience_has_years"]
+        self.position_mask = columns["position_mask"]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in COLUMN_NAMES}
+
+    @staticmethod
+    def schema_key(matcher: Any) -> str:
+        """
+        Fingerprint of everything the columns and index are derived with
+        (vocabularies, bit orders, tokenizer); stored corpora with another key are stale
+        """
+        schema = {
+            "columns": COLUMN_NAMES,
+            "education_levels": matcher.education_levels,
+            "relevant_fields": matcher.relevant_fields,
+            "thai_provinces": matcher.thai_provinces,
+            "position_terms": matcher.position_terms,
+            "tokenizer": TOKENIZER_VERSION,
+            "ngram_range": matcher.make_position_vectorizer().ngram_range,
+        }
+        raw = json.dumps(schema, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, str]], matcher: Any) -> "ResumeCorpus":
+        """Parse rows into columns using the matcher's salary parser and vocabularies"""
+        n = len(rows)
+        salary_min = np.zeros(n, dtype=np.int64)
+        salary_max = np.zeros(n, dtype=np.int64)
+        education_level = np.full(n, NO_EDUCATION_LEVEL, dtype=np.int8)
+        field_relevant = np.zeros(n, dtype=bool)
+        province_mask = np.zeros(n, dtype=np.int64)
+        experience_missing = np.zeros(n, dtype=bool)
+        experience_has_years = np.zeros(n, dtype=bool)
+        position_mask = np.zeros(n, dtype=np.int64)
+        position_texts = []
+
+        for i, row in enumerate(rows):
+            salary_min[i], salary_max[i] = matcher.parse_salary_range(row.get("เงินเดือน", ""))
+
+            education = row.get("ระดับการศึกษา", "")
+            for level, points in matcher.education_levels.items():
+                if level in education:
+                    education_level[i] = points
+                    break
+
+            field_lower = row.get("สาขา", "").lower()
+            field_relevant[i] = any(field in field_lower for field in matcher.relevant_fields)
+
+            province_lower = row.get("จังหวัด", "").lower()
+            mask = 0
+            for bit, province in enumerate(matcher.thai_provinces):
+                if province in province_lower:
+                    mask |= 1 << bit
+            province_mask[i] = mask
+
+            experience = row.get("ตำแหน่งที่เคยทำ", "")
+            experience_missing[i] = not experience or experience == "-"
+            experience_has_years[i] = "ปี" in experience or "year" in experience.lower()
+
+            position_text = position_text_of(row)
+            position_texts.append(position_text)
+            mask = 0
+            for bit, pos in enumerate(matcher.position_terms):
+                if pos in position_text:
+                    mask |= 1 << bit
+            position_mask[i] = mask
+
+        return cls(rows, {
+            "salary_min": salary_min,
+            "salary_max": salary_max,
+            "education_level": education_level,
+            "field_relevant": field_relevant,
+            "province_mask": province_mask,
+            "experience_missing": experience_missing,
+            "experience_has_years": experience_has_years,
+            "position_mask": position_mask,
+        }, CandidateIndex.build(matcher.token_cache.tokenize_many(position_texts), matcher.make_position_vectorizer()))
+
+    @classmethod
+    def from_csv(cls, csv_path: str, matcher: Any) -> "ResumeCorpus":
+        with open(csv_path, "r", encoding="utf-8-sig") as f:
+            rows = list(csv.DictReader(f))
+        return cls.from_rows(rows, matcher)
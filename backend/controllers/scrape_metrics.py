@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class PageMetrics:
+    """Measurements of one listing page: where its time went and what it yielded"""
+    search: str
+    page: int
+    # Time in client.get (every attempt) or reading the page cache on replay
+    fetch_seconds: float = 0.0
+    response_bytes: int = 0
+    parse_seconds: float = 0.0
+    rows_extracted: int = 0
+    # Resume rows on the page that produced no record (ignored IDs, broken rows)
+    rows_skipped: int = 0
+    attempts: int = 0
+    error: Optional[str] = None
+
+
+class ScrapeMetrics:
+    """
+    Per-page metrics of one scrape, and their totals
+    record() may be called from any thread. Besides the page totals, the
+    scrape adds rows it dropped after parsing (rows_unchanged for an
+    incremental scrape, rows_duplicate for resumes already seen under
+    another search) and the rows it finally saved.
+    """
+
+    def __init__(self, keep_pages: bool = True):
+        self.keep_pages = keep_pages
+        self.pages: List[PageMetrics] = []
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.rows_unchanged = 0
+        self.rows_duplicate = 0
+        self.rows_saved = 0
+        self._totals = PageMetrics(search="", page=0)
+        self._page_count = 0
+        self._failed_count = 0
+        self._lock = threading.Lock()
+
+    def record(self, page: PageMetrics) -> None:
+        with self._lock:
+            if self.keep_pages:
+                self.pages.append(page)
+            totals = self._totals
+            totals.fetch_seconds += page.fetch_seconds
+            totals.response_bytes += page.response_bytes
+            totals.parse_seconds += page.parse_seconds
+            totals.rows_extracted += page.rows_extracted
+            totals.rows_skipped += page.rows_skipped
+            totals.attempts += page.attempts
+            self._page_count += 1
+            if page.error is not None:
+                self._failed_count += 1
+
+    def finish(self, rows_saved: int) -> None:
+        self.rows_saved = rows_saved
+        self.finished_at = time.time()
+
+    @property
+    def wall_seconds(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
+
+    def totals(self) -> Dict[str, Any]:
+        with self._lock:
+            totals = self._totals
+            return {
+                "pages": self._page_count,
+                "failed_pages": self._failed_count,
+                "requests": totals.attempts,
+                "fetch_seconds": round(totals.fetch_seconds, 3),
+                "response_bytes": totals.response_bytes,
+                "parse_seconds": round(totals.parse_seconds, 3),
+                "rows_extracted": totals.rows_extracted,
+                "rows_skipped": totals.rows_skipped,
+                "rows_unchanged": self.rows_unchanged,
+                "rows_duplicate": self.rows_duplicate,
+                "rows_saved": self.rows_saved,
+                "wall_seconds": round(self.wall_seconds, 3)
+            }
+
+    def to_dict(self, include_pages: bool = False) -> Dict[str, Any]:
+        data = self.totals()
+        if include_pages:
+            with self._lock:
+                data["page_metrics"] = [asdict(page) for page in self.pages]
+        return data
+
+    def summary(self) -> str:
+        """One line for the scraper's log output"""
+        totals = self.totals()
+        return (
+            f"{totals['pages']} pages, {totals['response_bytes'] / 1024:.0f} KB in "
+            f"{totals['fetch_seconds']:.2f}s fetch + {totals['parse_seconds']:.2f}s parse "
+            f"({totals['wall_seconds']:.2f}s wall), {totals['rows_extracted']} rows extracted, "
+            f"{totals['rows_skipped']} skipped"
+        )
+
+
+class MetricsLog:
+    """
+    Recent scrape and match timings for the API's /metrics endpoint
+    Keeps the last `size` scrapes (totals per search configuration) and match
+    runs (seconds spent getting the corpus, ranking and enriching), so a slow
+    match can be traced to the network, parsing or scoring.
+    """
+
+    def __init__(self, size: int = 50):
+        self._scrapes: deque = deque(maxlen=size)
+        self._matches: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record_scrape(self, key: str, metrics: ScrapeMetrics) -> None:
+        entry = {
+            "corpus": key,
+            "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(metrics.finished_at or time.time())),
+            **metrics.totals()
+        }
+        with self._lock:
+            self._scrapes.append(entry)
+
+    def record_match(self, endpoint: str, timings: Dict[str, float]) -> None:
+        entry = {
+            "endpoint": endpoint,
+            "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            **{stage: round(seconds, 3) for stage, seconds in timings.items()}
+        }
+        with self._lock:
+            self._matches.append(entry)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Recent scrapes and matches, newest first"""
+        with self._lock:
+            return {
+                "scrapes": list(reversed(self._scrapes)),
+                "matches": list(reversed(self._matches))
+            }
@@ -0,0 +1,67 @@
+import hashlib
+import os
+from typing import Optional
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+# Read uploads in 1MB chunks so memory stays constant regardless of file size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """Raised when a copied upload grows past its size limit"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        super().__init__(f"File too large. Maximum size is {max_size // (1024 * 1024)}MB")
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+async def stream_upload_to_path(
+    file: UploadFile,
+    dest_path: str,
+    max_size: Optional[int] = None,
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> tuple[int, str]:
+    """
+    Copy an upload to dest_path chunk by chunk
+    Hashes with SHA-256 on the fly and stops copying once max_size is exceeded.
+    The UploadFile has already been received and spooled by Starlette when
+    this runs, so the limit bounds what lands in dest_path, not what the
+    client may send. Data is written to "<dest_path>.part" and renamed on success, so a failed
+    upload never leaves a truncated file behind. All disk I/O runs in the
+    threadpool to keep the event loop free.
+    Returns (size_in_bytes, sha256_hexdigest)
+    """
+    part_path = f"{dest_path}.part"
+    hasher = hashlib.sha256()
+    size = 0
+
+    out = await run_in_threadpool(open, part_path, 'wb')
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+
+            size += len(chunk)
+            if max_size is not None and size > max_size:
+                raise UploadTooLargeError(max_size)
+
+            hasher.update(chunk)
+            await run_in_threadpool(out.write, chunk)
+    except BaseException:
+        await run_in_threadpool(out.close)
+        await run_in_threadpool(_remove_quietly, part_path)
+        raise
+
+    await run_in_threadpool(out.close)
+    await run_in_threadpool(os.replace, part_path, dest_path)
+    return size, hasher.hexdigest()
@@ -12,10 +12,12 @@ async def lifespan(app: FastAPI):
     data_dir = os.path.join(os.getcwd(), 'data')
     os.makedirs(data_dir, exist_ok=True)
     print(f"Data directory: {data_dir}")
+    match_job.corpus_refresher.start()
     try:
         yield
     finally:
         print("Shutting down...")
+        await match_job.corpus_refresher.stop()
 
 app = FastAPI(
     title="Smart Job & Resume Analyzer", 
@@ -45,6 +47,9 @@ async def root():
         "endpoints": {
             "analyze_resume": "/api/analyze-resume",
             "match_job": "/api/match-job",
+            "match_job_stream": "/api/match-job/stream",
+            "match_results": "/api/match-results/{result_id}",
+            "metrics": "/api/metrics",
             "upload_resumes": "/api/upload-resumes",
             "list_resumes": "/api/list-resumes"
         },
@@ -6,6 +6,7 @@ import logging
 
 # Import your analyzer class
 from controllers.resume_analyzer import ThaiResumeAnalyzer
+from controllers.upload_stream import stream_upload_to_path, UploadTooLargeError
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -33,42 +34,27 @@ async def analyze_resume_endpoint(file: UploadFile = File(...)):
             detail=f"Unsupported file type. Only {', '.join(SUPPORTED_EXTENSIONS)} are supported."
         )
     
-    # Check file size (max 10MB)
+    # Check file size (max 10MB) while copying it to disk
     max_size = 10 * 1024 * 1024  # 10MB
-    file.file.seek(0, 2)  # Seek to end
-    file_size = file.file.tell()
-    file.file.seek(0)  # Reset to beginning
-    
-    if file_size > max_size:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Maximum size is {max_size // (1024*1024)}MB"
-        )
-    
-    if file_size == 0:
-        raise HTTPException(
-            status_code=400,
-            detail="File is empty"
-        )
-    
     temp_file_path: Optional[str] = None
     
     try:
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(
-            delete=False, 
-            suffix=file_extension,
-            prefix="resume_"
-        ) as temp_file:
-            # Read and write file content
-            content = await file.read()
-            if not content:
-                raise HTTPException(status_code=400, detail="File content is empty")
-            
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # Create temporary file and stream the upload into it
+        fd, temp_file_path = tempfile.mkstemp(suffix=file_extension, prefix="resume_")
+        os.close(fd)
+        
+        try:
+            file_size, file_sha256 = await stream_upload_to_path(file, temp_file_path, max_size=max_size)
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        if file_size == 0:
+            raise HTTPException(
+                status_code=400,
+                detail="File is empty"
+            )
         
-        logger.info(f"Processing resume file: {file.filename}, size: {file_size} bytes")
+        logger.info(f"Processing resume file: {file.filename}, size: {file_size} bytes, sha256: {file_sha256}")
         
         # Analyze resume
         analyzer = ThaiResumeAnalyzer()
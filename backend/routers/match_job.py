@@ -1,36 +1,125 @@
-from typing import Dict, Any, List, Optional
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from pydantic import BaseModel
+from typing import Dict, Any, List, Optional, Sequence, Set, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from pydantic import BaseModel, Field
 import os
 import logging
 import csv
+import json
 import re
+import time
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from pythainlp import word_tokenize
 from pythainlp.util import normalize
 import numpy as np
 
+from controllers.corpus_refresher import CorpusRefresher
+from controllers.page_cache import RawPageCache
+from controllers.profile_enrichment import ProfileEnricher
+from controllers.jobthai_scraper import DEFAULT_SEARCH, SearchQuery, aiter_search_pages, jobthai_circuit_breaker
+from controllers.corpus_store import EDUCATION_LEVELS, parse_salary_range
+from controllers.resume_corpus import ResumeCorpus
+from controllers.candidate_index import maxscore_top_k
+from controllers.corpus_binary import binary_path_for, read_corpus_binary, write_corpus_binary
+from controllers.position_tokens import PositionTokenCache, pretokenized, tokenize_position_text
+from controllers.match_results import HIGH_QUALITY_SCORE, MatchResultStore, RankedResults, RankingCache, fingerprint, TopKSelector, encode_cursor, decode_cursor, parse_fields, project_result
+from controllers.upload_stream import stream_upload_to_path
+from controllers.scrape_metrics import MetricsLog, ScrapeMetrics
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Job-description patterns, compiled once at import
+SALARY_PATTERNS = [
+    re.compile(r'เงินเดือน[:\s]*(\d{1,3}(?:,\d{3})+|\d{5,6})'),
+    re.compile(r'salary[:\s]*(\d{1,3}(?:,\d{3})+|\d{5,6})'),
+    re.compile(r'(\d{1,3}(?:,\d{3})+|\d{5,6})\s*บาท'),
+    re.compile(r'(\d{2,3})k'),
+]
+
+EXPERIENCE_PATTERNS = [
+    re.compile(r'(\d+)\s*(?:ปี|years?)\s*(?:ขึ้นไป|experience|ประสบการณ์)'),
+    re.compile(r'experience[:\s]*(\d+)\s*(?:years?|ปี)'),
+    re.compile(r'ประสบการณ์[:\s]*(\d+)\s*ปี'),
+]
+
 SUPPORTED_EXTS = {'.pdf', '.docx', '.txt', '.csv'}
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB per file
+
+# Streaming /match-job: rows per chunk when replaying a snapshot
+STREAM_PAGE_SIZE = 20
 
 class CookieData(BaseModel):
     phpsessid: str
     guest_id: str
     fcnec: str
 
+class SearchParams(BaseModel):
+    """One JobThai resume search; several are scraped together and merged"""
+    jobtype: str = "Computer"
+    region: str = ""
+    keyword: str = ""
+
+class CorpusFilters(BaseModel):
+    """Hard filters pushed down into the SQLite corpus query"""
+    max_salary: Optional[int] = None
+    provinces: Optional[List[str]] = None
+    # Education level code: 0 มัธยมศึกษา, 1 ปวช, 2 ปวส, 3 ปริญญาตรี, 4 ปริญญาโท, 5 ปริญญาเอก
+    min_education_level: Optional[int] = Field(None, ge=0, le=5)
+    # Resumes whose last-update date is unknown are kept
+    updated_within_days: Optional[int] = Field(None, ge=0)
+
 class MatchJobRequest(BaseModel):
     cookies: CookieData
     analysis: Dict[str, Any]
     job_description: str
+    max_pages: int = Field(10, ge=1, le=50)
+    # Searches to cover (max_pages each), merged into one corpus; default Computer, all regions
+    searches: Optional[List[SearchParams]] = Field(None, min_length=1, max_length=5)
+    # Accept a scraped corpus up to this many seconds old (0 forces a fresh scrape)
+    max_snapshot_age: Optional[int] = 60 * 60
+    # Number of top matches returned with full details
+    top_k: int = Field(20, ge=1, le=200)
+    # When set, score only resumes in the local corpus store that pass these filters
+    filters: Optional[CorpusFilters] = None
+    # Fetch and analyze the profile pages of this many top matches (0 disables)
+    enrich_top: int = Field(0, ge=0, le=50)
+
+@dataclass(frozen=True)
+class JobQuery:
+    """
+    Job description parsed once per match request
+    Everything here depends only on the job text, so per-row scoring only has
+    to look at the resume side.
+    """
+    text: str
+    text_lower: str
+    expected_salary: Optional[int]
+    required_experience: int
+    mentioned_provinces: Tuple[str, ...]
+    job_positions: Tuple[str, ...]
+    tokens: Tuple[str, ...]
+
+@dataclass(frozen=True)
+class MatchPlan:
+    """
+    Per-request scoring state built by EnhancedJobMatcher.prepare_match
+    request_factors holds the (score, details) of every factor that depends only
+    on the analysis and the job query, computed once and shared by all rows.
+    """
+    query: JobQuery
+    request_factors: Dict[str, Tuple[float, Dict]]
 
 class EnhancedJobMatcher:
     """Enhanced job matcher with NLP capabilities for Thai and English"""
     
-    def __init__(self):
+    def __init__(self, token_cache: Optional[PositionTokenCache] = None):
+        # Segmented position texts, shared by every match (memory-only unless given a store)
+        self.token_cache = token_cache or PositionTokenCache()
+        
         self.tech_skills = {
             'programming': ['python', 'java', 'javascript', 'c++', 'c#', 'php', 'ruby', 'go', 'sql', 'swift', 'kotlin', 'typescript', 'rust', 'scala', 'tester', 'software tester', 'qa'],
             'web': ['html', 'css', 'react', 'vue', 'angular', 'node.js', 'django', 'flask', 'laravel', 'spring', 'express', 'next.js', 'nuxt.js'],
@@ -57,50 +146,57 @@ class EnhancedJobMatcher:
             'support': ['support', 'it support', 'technical support', 'helpdesk', 'สนับสนุน'],
         }
         
+        # Flattened in category order; also the bit order of ResumeCorpus.position_mask
+        self.position_terms = [pos for positions in self.job_positions.values() for pos in positions]
+        
         self.thai_provinces = [
             'กรุงเทพ', 'กรุงเทพมหานคร', 'นนทบุรี', 'ปทุมธานี', 'สมุทรปราการ', 'สมุทรสาคร',
             'นครปฐม', 'ชลบุรี', 'ระยอง', 'เชียงใหม่', 'เชียงราย', 'ขอนแก่น', 'อุดรธานี',
             'นครราชสีมา', 'ภูเก็ต', 'สงขลา', 'หาดใหญ่'
         ]
         
-        self.education_levels = {
-            'ปริญญาเอก': 5,
-            'ปริญญาโท': 4,
-            'ปริญญาตรี': 3,
-            'ปวส': 2,
-            'ปวช': 1,
-            'มัธยมศึกษา': 0
+        self.education_levels = dict(EDUCATION_LEVELS)
+        
+        self.relevant_fields = [
+            'สารสนเทศ', 'คอมพิวเตอร์', 'วิศวกรรม', 'it', 'computer', 'information',
+            'software', 'engineering', 'วิทยาการคอมพิวเตอร์', 'เทคโนโลยี'
+        ]
+        
+        # Scoring factors are split by what they read:
+        # - per-request factors take (analysis, query) only and are computed once per
+        #   match run in prepare_match, so they never scale with corpus size
+        # - per-row factors read resume fields and run in calculate_match_score
+        # Register new factors here unless they genuinely need resume fields.
+        self.request_factors = {
+            "skills": self.calculate_skills_match,
         }
 
     def parse_salary_range(self, salary_str: str) -> tuple[int, int]:
         """Parse salary string to min/max values"""
-        if not salary_str or salary_str == "-":
-            return (0, 0)
-        
-        # Remove commas and spaces
-        salary_str = salary_str.replace(',', '').replace(' ', '')
-        
-        # Extract numbers
-        numbers = re.findall(r'\d+', salary_str)
-        
-        if len(numbers) >= 2:
-            return (int(numbers[0]), int(numbers[1]))
-        elif len(numbers) == 1:
-            val = int(numbers[0])
-            return (val, val)
-        return (0, 0)
-
-    def extract_salary_from_job_desc(self, job_desc: str) -> Optional[int]:
-        """Extract expected salary from job description"""
-        patterns = [
-            r'เงินเดือน[:\s]*(\d{1,3}(?:,\d{3})+|\d{5,6})',
-            r'salary[:\s]*(\d{1,3}(?:,\d{3})+|\d{5,6})',
-            r'(\d{1,3}(?:,\d{3})+|\d{5,6})\s*บาท',
-            r'(\d{2,3})k',
-        ]
+        return parse_salary_range(salary_str)
+
+    def normalize_job_description(self, job_desc: str) -> str:
+        """Thai-normalised, lowercased text with whitespace runs collapsed; what all matching reads"""
+        return " ".join(normalize(job_desc).split()).lower()
+
+    def compile_job_query(self, job_desc: str) -> JobQuery:
+        """Parse the job description once into a JobQuery shared by every row of a match run"""
+        job_lower = self.normalize_job_description(job_desc)
         
-        for pattern in patterns:
-            match = re.search(pattern, job_desc.lower())
+        return JobQuery(
+            text=job_desc,
+            text_lower=job_lower,
+            expected_salary=self.extract_salary_from_job_desc(job_lower),
+            required_experience=self.extract_required_experience(job_lower),
+            mentioned_provinces=tuple(p for p in self.thai_provinces if p in job_lower),
+            job_positions=tuple(pos for pos in self.position_terms if pos in job_lower),
+            tokens=tuple(tokenize_position_text(job_lower))
+        )
+
+    def extract_salary_from_job_desc(self, job_lower: str) -> Optional[int]:
+        """Extract expected salary from a normalised (lower-cased) job description"""
+        for pattern in SALARY_PATTERNS:
+            match = pattern.search(job_lower)
             if match:
                 val_str = match.group(1).replace(',', '')
                 if 'k' in match.group(0):
@@ -108,9 +204,17 @@ class EnhancedJobMatcher:
                 return int(val_str)
         return None
 
-    def calculate_salary_score(self, resume_salary: str, job_desc: str) -> tuple[float, Dict]:
+    def extract_required_experience(self, job_lower: str) -> int:
+        """Extract required years of experience from a normalised job description (0 if not stated)"""
+        for pattern in EXPERIENCE_PATTERNS:
+            match = pattern.search(job_lower)
+            if match:
+                return int(match.group(1))
+        return 0
+
+    def calculate_salary_score(self, resume_salary: str, query: JobQuery) -> tuple[float, Dict]:
         """Calculate salary match score with detailed breakdown"""
-        expected_salary = self.extract_salary_from_job_desc(job_desc)
+        expected_salary = query.expected_salary
         resume_min, resume_max = self.parse_salary_range(resume_salary)
         
         if not expected_salary or resume_min == 0:
@@ -138,46 +242,84 @@ class EnhancedJobMatcher:
         
         return 8.0, {"status": "moderate_match", "expected": expected_salary, "resume_range": f"{resume_min}-{resume_max}"}
 
-    def calculate_position_similarity(self, resume_position: str, resume_experience: str, job_desc: str) -> tuple[float, List[str]]:
-        """Calculate position match using semantic similarity"""
+    def calculate_position_similarity(
+        self,
+        resume_position: str,
+        resume_experience: str,
+        query: JobQuery,
+        similarity: Optional[float] = None
+    ) -> tuple[float, List[str]]:
+        """
+        Calculate position match using semantic similarity
+        Pass a precomputed TF-IDF similarity (see calculate_position_similarities)
+        to skip fitting a vectorizer for this single pair
+        """
         resume_text = f"{resume_position} {resume_experience}".lower()
-        job_text = job_desc.lower()
         
         matched_positions = []
         position_score = 0.0
         
-        # Check for exact position matches
-        for category, positions in self.job_positions.items():
-            for pos in positions:
-                if pos in resume_text or pos in job_text:
-                    if pos in resume_text and pos in job_text:
-                        position_score += 5.0
-                        matched_positions.append(pos)
+        # Check for exact position matches (positions found in the job text are precomputed)
+        for pos in query.job_positions:
+            if pos in resume_text:
+                position_score += 5.0
+                matched_positions.append(pos)
         
         # Use TF-IDF for semantic similarity
+        if similarity is None:
+            similarity = self.calculate_position_similarities(
+                [{"ตำแหน่งที่สมัคร": resume_position, "ตำแหน่งที่เคยทำ": resume_experience}],
+                query
+            )[0]
+        
+        # Add similarity bonus
+        position_score += similarity * 15.0
+        
+        return min(position_score, 25.0), matched_positions
+
+    def calculate_position_similarities(self, resume_rows: List[Dict[str, str]], query: JobQuery) -> List[float]:
+        """
+        TF-IDF cosine similarity of every resume's position/experience text to the job description
+        One vectorizer is fitted over all resume texts plus the job description, so IDF
+        reflects the whole corpus; TF-IDF rows are L2-normalised, so all similarities
+        come from a single sparse matrix-vector product.
+        """
+        if not resume_rows:
+            return []
+        
+        texts = [
+            f"{row.get('ตำแหน่งที่สมัคร', '')} {row.get('ตำแหน่งที่เคยทำ', '')}".lower()
+            for row in resume_rows
+        ]
+        
         try:
-            vectorizer = TfidfVectorizer(
-                lowercase=True,
-                ngram_range=(1, 2),
-                min_df=1,
-                max_features=500
-            )
-            
-            texts = [resume_text, job_text]
-            tfidf_matrix = vectorizer.fit_transform(texts)
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-            
-            # Add similarity bonus
-            position_score += similarity * 15.0
+            vectorizer = self.make_position_vectorizer()
+            tfidf_matrix = vectorizer.fit_transform(self.token_cache.tokenize_many(texts) + [list(query.tokens)])
+            similarities = (tfidf_matrix[:-1] @ tfidf_matrix[-1].T).toarray().ravel()
+            return similarities.tolist()
             
         except Exception as e:
             logger.warning(f"TF-IDF calculation failed: {e}")
-        
-        return min(position_score, 25.0), matched_positions
+            return [0.0] * len(resume_rows)
+
+    def make_position_vectorizer(self) -> TfidfVectorizer:
+        """
+        Vectorizer for position/experience texts (per batch here, per corpus in CandidateIndex)
+        Fed token lists from tokenize_position_text, as the default token pattern
+        cannot split unsegmented Thai.
+        """
+        return TfidfVectorizer(
+            preprocessor=pretokenized,
+            tokenizer=pretokenized,
+            token_pattern=None,
+            lowercase=False,
+            ngram_range=(1, 2),
+            min_df=1
+        )
 
-    def calculate_skills_match(self, resume_data: Dict, analysis: Dict, job_desc: str) -> tuple[float, Dict]:
-        """Calculate comprehensive skills match score"""
-        job_desc_lower = job_desc.lower()
+    def calculate_skills_match(self, analysis: Dict, query: JobQuery) -> tuple[float, Dict]:
+        """Calculate comprehensive skills match score (per-request: independent of the resume row)"""
+        job_desc_lower = query.text_lower
         matched_skills = []
         skill_categories = {}
         
@@ -220,7 +362,7 @@ class EnhancedJobMatcher:
             "total_matched": len(matched_skills)
         }
 
-    def calculate_education_score(self, resume_education: str, resume_field: str, job_desc: str) -> tuple[float, Dict]:
+    def calculate_education_score(self, resume_education: str, resume_field: str, query: JobQuery) -> tuple[float, Dict]:
         """Calculate education relevance score"""
         score = 0.0
         details = {}
@@ -233,15 +375,9 @@ class EnhancedJobMatcher:
                 break
         
         # Field relevance
-        relevant_fields = [
-            'สารสนเทศ', 'คอมพิวเตอร์', 'วิศวกรรม', 'it', 'computer', 'information',
-            'software', 'engineering', 'วิทยาการคอมพิวเตอร์', 'เทคโนโลยี'
-        ]
-        
         field_lower = resume_field.lower()
-        job_lower = job_desc.lower()
         
-        for field in relevant_fields:
+        for field in self.relevant_fields:
             if field in field_lower:
                 score += 5.0
                 details["field_relevant"] = True
@@ -250,43 +386,25 @@ class EnhancedJobMatcher:
         details["field"] = resume_field
         return min(score, 15.0), details
 
-    def calculate_location_score(self, resume_province: str, job_desc: str) -> tuple[float, Dict]:
+    def calculate_location_score(self, resume_province: str, query: JobQuery) -> tuple[float, Dict]:
         """Calculate location match score"""
         resume_province_lower = resume_province.lower()
-        job_desc_lower = job_desc.lower()
-        
-        # Check if location is mentioned in job description
-        location_mentioned = False
-        matched_province = None
         
-        for province in self.thai_provinces:
-            if province in job_desc_lower:
-                location_mentioned = True
-                if province in resume_province_lower:
-                    matched_province = province
-                    return 10.0, {"status": "exact_match", "province": province}
+        # Provinces mentioned in the job description are precomputed in the query
+        for province in query.mentioned_provinces:
+            if province in resume_province_lower:
+                return 10.0, {"status": "exact_match", "province": province}
         
         # If no specific location mentioned, give neutral score
-        if not location_mentioned:
+        if not query.mentioned_provinces:
             return 5.0, {"status": "not_specified", "province": resume_province}
         
         # Location mismatch
         return 2.0, {"status": "mismatch", "resume_province": resume_province}
 
-    def calculate_experience_score(self, resume_experience: str, job_desc: str) -> tuple[float, Dict]:
+    def calculate_experience_score(self, resume_experience: str, query: JobQuery) -> tuple[float, Dict]:
         """Calculate experience relevance score"""
-        job_exp_required = 0
-        exp_patterns = [
-            r'(\d+)\s*(?:ปี|years?)\s*(?:ขึ้นไป|experience|ประสบการณ์)',
-            r'experience[:\s]*(\d+)\s*(?:years?|ปี)',
-            r'ประสบการณ์[:\s]*(\d+)\s*ปี'
-        ]
-        
-        for pattern in exp_patterns:
-            match = re.search(pattern, job_desc.lower())
-            if match:
-                job_exp_required = int(match.group(1))
-                break
+        job_exp_required = query.required_experience
         
         # If no experience requirement, give neutral score
         if job_exp_required == 0:
@@ -302,54 +420,69 @@ class EnhancedJobMatcher:
         
         return 5.0, {"status": "unclear", "experience": resume_experience}
 
+    def prepare_match(self, analysis: Dict[str, Any], query: JobQuery) -> MatchPlan:
+        """Compute every per-request factor once for a match run"""
+        return MatchPlan(
+            query=query,
+            request_factors={
+                name: factor(analysis, query)
+                for name, factor in self.request_factors.items()
+            }
+        )
+
     def calculate_match_score(
         self,
         resume_data: Dict[str, str],
-        analysis: Dict[str, Any],
-        job_description: str
+        plan: MatchPlan,
+        position_similarity: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Enhanced match score calculation with NLP and multi-factor analysis
+        plan: per-request state from prepare_match (compiled query + request factors)
+        position_similarity: precomputed TF-IDF similarity from calculate_position_similarities
         """
+        query = plan.query
         
-        # 1. Skills matching (40 points)
-        skills_score, skills_details = self.calculate_skills_match(resume_data, analysis, job_description)
+        # 1. Skills matching (40 points) and any other per-request factors, precomputed
+        request_score = sum(score for score, _ in plan.request_factors.values())
+        skills_details = plan.request_factors["skills"][1]
         
         # 2. Position matching (25 points)
         position_score, matched_positions = self.calculate_position_similarity(
             resume_data.get("ตำแหน่งที่สมัคร", ""),
             resume_data.get("ตำแหน่งที่เคยทำ", ""),
-            job_description
+            query,
+            similarity=position_similarity
         )
         
         # 3. Salary matching (20 points)
         salary_score, salary_details = self.calculate_salary_score(
             resume_data.get("เงินเดือน", ""),
-            job_description
+            query
         )
         
         # 4. Education matching (15 points)
         education_score, education_details = self.calculate_education_score(
             resume_data.get("ระดับการศึกษา", ""),
             resume_data.get("สาขา", ""),
-            job_description
+            query
         )
         
         # 5. Location matching (10 points)
         location_score, location_details = self.calculate_location_score(
             resume_data.get("จังหวัด", ""),
-            job_description
+            query
         )
         
         # 6. Experience matching (10 points)
         experience_score, experience_details = self.calculate_experience_score(
             resume_data.get("ตำแหน่งที่เคยทำ", ""),
-            job_description
+            query
         )
         
         # Calculate total score
         total_score = (
-            skills_score +
+            request_score +
             position_score +
             salary_score +
             education_score +
@@ -363,7 +496,7 @@ class EnhancedJobMatcher:
         return {
             "total_score": round(total_score, 2),
             "breakdown": {
-                "skills": round(skills_score, 2),
+                **{name: round(score, 2) for name, (score, _) in plan.request_factors.items()},
                 "position": round(position_score, 2),
                 "salary": round(salary_score, 2),
                 "education": round(education_score, 2),
@@ -371,7 +504,7 @@ class EnhancedJobMatcher:
                 "experience": round(experience_score, 2)
             },
             "details": {
-                "skills": skills_details,
+                **{name: details for name, (_, details) in plan.request_factors.items()},
                 "matched_positions": matched_positions,
                 "salary": salary_details,
                 "education": education_details,
@@ -395,6 +528,88 @@ class EnhancedJobMatcher:
             }
         }
 
+    # Vectorised scoring over a ResumeCorpus. Each method mirrors its scalar
+    # calculate_*_score counterpart exactly and returns one score per row.
+
+    def calculate_salary_scores(self, corpus: ResumeCorpus, query: JobQuery) -> np.ndarray:
+        expected = query.expected_salary
+        if not expected:
+            return np.full(len(corpus), 10.0)
+        
+        resume_min, resume_max = corpus.salary_min, corpus.salary_max
+        return np.select(
+            [
+                resume_min == 0,
+                (resume_min <= expected) & (expected <= resume_max),
+                resume_min <= expected * 1.1,
+                resume_min <= expected * 1.2,
+                resume_min <= expected * 1.3,
+                resume_min > expected * 1.5,
+            ],
+            [10.0, 20.0, 18.0, 15.0, 12.0, 5.0],
+            default=8.0
+        )
+
+    def calculate_education_scores(self, corpus: ResumeCorpus) -> np.ndarray:
+        level_points = np.where(corpus.education_level >= 0, corpus.education_level * 2.0, 0.0)
+        return np.minimum(level_points + np.where(corpus.field_relevant, 5.0, 0.0), 15.0)
+
+    def calculate_location_scores(self, corpus: ResumeCorpus, query: JobQuery) -> np.ndarray:
+        if not query.mentioned_provinces:
+            return np.full(len(corpus), 5.0)
+        
+        job_mask = 0
+        for province in query.mentioned_provinces:
+            job_mask |= 1 << self.thai_provinces.index(province)
+        return np.where((corpus.province_mask & job_mask) != 0, 10.0, 2.0)
+
+    def calculate_experience_scores(self, corpus: ResumeCorpus, query: JobQuery) -> np.ndarray:
+        if query.required_experience == 0:
+            return np.full(len(corpus), 5.0)
+        return np.where(corpus.experience_missing, 3.0, np.where(corpus.experience_has_years, 10.0, 5.0))
+
+    def calculate_position_counts(self, corpus: ResumeCorpus, query: JobQuery) -> np.ndarray:
+        """Number of query.job_positions found in each row, read from the position_mask bits"""
+        counts = np.zeros(len(corpus), dtype=np.int64)
+        for bit, pos in enumerate(self.position_terms):
+            if pos in query.text_lower:
+                counts += (corpus.position_mask >> bit) & 1
+        return counts
+
+    def calculate_position_scores(self, counts: np.ndarray, similarities) -> np.ndarray:
+        return np.minimum(counts * 5.0 + np.asarray(similarities, dtype=np.float64) * 15.0, 25.0)
+
+    def calculate_component_scores(self, corpus: ResumeCorpus, query: JobQuery) -> Dict[str, np.ndarray]:
+        """Every per-row factor that does not depend on the TF-IDF similarity"""
+        return {
+            "salary": self.calculate_salary_scores(corpus, query),
+            "education": self.calculate_education_scores(corpus),
+            "location": self.calculate_location_scores(corpus, query),
+            "experience": self.calculate_experience_scores(corpus, query),
+        }
+
+    def combine_scores(
+        self,
+        plan: MatchPlan,
+        components: Dict[str, np.ndarray],
+        position_scores: np.ndarray,
+        rows: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Total match score, summed in calculate_match_score's order so both give the same value
+        rows selects a subset of the corpus (position_scores is then given for that subset)
+        """
+        request_score = sum(score for score, _ in plan.request_factors.values())
+        column = (lambda name: components[name]) if rows is None else (lambda name: components[name][rows])
+        return (
+            request_score +
+            position_scores +
+            column("salary") +
+            column("education") +
+            column("location") +
+            column("experience")
+        )
+
     def _generate_recommendation(self, total_score: float, skills_details: Dict, salary_details: Dict) -> str:
         """Generate hiring recommendation based on score"""
         if total_score >= 85:
@@ -414,8 +629,206 @@ class EnhancedJobMatcher:
         else:
             return "❌ ไม่แนะนำ - คุณสมบัติไม่ตรงกับความต้องการของงาน"
 
-# Initialize matcher
-matcher = EnhancedJobMatcher()
+# Recent scrape totals and match timings, served by /metrics
+metrics_log = MetricsLog()
+
+# Scraped corpus snapshots, refreshed in the background (started from main.lifespan);
+# raw pages are archived so the corpus can be re-derived offline
+corpus_refresher = CorpusRefresher(page_cache=RawPageCache(), metrics_log=metrics_log)
+
+# Initialize matcher; segmented position texts are persisted in the corpus store
+matcher = EnhancedJobMatcher(PositionTokenCache(lambda: corpus_refresher.corpus_store))
+
+# Profile-page details of top matches, cached in the corpus store
+profile_enricher = ProfileEnricher(lambda: corpus_refresher.corpus_store)
+
+# Full rankings of recent match runs, addressable by result_id
+match_results = MatchResultStore()
+
+# Rankings by (corpus, version, request); a new corpus version invalidates older entries
+ranking_cache = RankingCache()
+
+def ranking_cache_key(payload: MatchJobRequest) -> str:
+    """Request part of a ranking cache key: normalised job description, analysis and ranking options"""
+    return ":".join([
+        fingerprint(matcher.normalize_job_description(payload.job_description)),
+        fingerprint(payload.analysis),
+        fingerprint({
+            "top_k": payload.top_k,
+            "filters": payload.filters.model_dump() if payload.filters is not None else None
+        })
+    ])
+
+def search_queries(payload: MatchJobRequest) -> Optional[List[SearchQuery]]:
+    if payload.searches is None:
+        return None
+    return [SearchQuery(**search.model_dump()) for search in payload.searches]
+
+def prepare_plan(payload: MatchJobRequest) -> MatchPlan:
+    """Compile the job query and per-request factors once per match request"""
+    return matcher.prepare_match(payload.analysis, matcher.compile_job_query(payload.job_description))
+
+@lru_cache(maxsize=8)
+def snapshot_resume_ids(csv_path: str) -> Tuple[str, ...]:
+    """เรซูเม่ ID of every row of a snapshot file (immutable, so cached by path)"""
+    with open(csv_path, 'r', encoding='utf-8-sig') as f:
+        return tuple(row["เรซูเม่ ID"] for row in csv.DictReader(f))
+
+def filtered_rows(filters: CorpusFilters, resume_ids: Sequence[str]) -> List[Dict[str, str]]:
+    """Rows of the given resumes that pass the hard filters, queried from the SQLite corpus"""
+    return corpus_refresher.corpus_store.query(**filters.model_dump(), resume_ids=resume_ids)
+
+def filtered_cache_version(snapshot_version: str) -> str:
+    """Ranking cache version of a filtered ranking: the snapshot it is scoped to, then the store's data version"""
+    return f"{snapshot_version}:{corpus_refresher.corpus_store.data_version()}"
+
+@lru_cache(maxsize=8)
+def load_corpus(csv_path: str) -> ResumeCorpus:
+    """
+    Columnar corpus and candidate index for a snapshot file; snapshot versions are immutable, so cache by path
+    The first load of a snapshot (in any worker) parses the CSV and writes its
+    binary form next to it; every load after that maps the binary read-only,
+    so workers share one copy through the page cache.
+    """
+    schema_key = ResumeCorpus.schema_key(matcher)
+    binary_path = binary_path_for(csv_path)
+    
+    corpus = read_corpus_binary(binary_path, schema_key, matcher)
+    if corpus is None:
+        corpus = ResumeCorpus.from_csv(csv_path, matcher)
+        try:
+            write_corpus_binary(corpus, schema_key, binary_path)
+            corpus = read_corpus_binary(binary_path, schema_key, matcher) or corpus
+        except OSError as e:
+            logger.warning(f"Could not write binary corpus {binary_path}: {e}")
+    return corpus
+
+def rank_corpus(corpus: ResumeCorpus, plan: MatchPlan, top_k: int = 20, exhaustive: bool = False) -> RankedResults:
+    """
+    Score the corpus and rank it, fully scoring only candidates that can still reach the top-k
+    Every factor but the TF-IDF position similarity is an array expression over
+    the corpus columns, so those totals are exact for all rows up front. They
+    are computed for every row, not just candidates: a resume sharing no term
+    with the job can still reach the top-k on the other factors, and the
+    statistics cover all rows. Only the similarity work is pruned. Resumes
+    sharing no term with the job (not in any of its posting lists) have
+    similarity 0; the candidates that do get an upper bound from the index and
+    are scored best-bound-first until no remaining bound can reach the k-th best
+    score (see maxscore_top_k). The top-k is the same as with exhaustive=True,
+    which scores every candidate.
+    Full result payloads (details, resume_data) are only built for rows that are
+    actually returned or paged to.
+    """
+    query = plan.query
+    index = corpus.index
+    terms, weights = index.query_terms(list(query.tokens))
+    postings = index.query_postings(terms)
+    candidates = index.candidates(postings)
+    
+    counts = matcher.calculate_position_counts(corpus, query)
+    components = matcher.calculate_component_scores(corpus, query)
+    similarities = np.zeros(len(corpus))
+    similarities[candidates] = np.nan
+    
+    def score_candidates(rows: np.ndarray) -> np.ndarray:
+        similarities[rows] = index.similarities(postings, weights, rows)
+        position_scores = matcher.calculate_position_scores(counts[rows], similarities[rows])
+        return matcher.combine_scores(plan, components, position_scores, rows)
+    
+    # Exact for non-candidates (similarity 0), the lower bound for candidates
+    lower_bounds = matcher.combine_scores(plan, components, matcher.calculate_position_scores(counts, 0.0))
+    totals = lower_bounds.copy()
+    totals[candidates] = np.nan
+    
+    bound = index.similarity_bound(terms, weights)
+    upper_bounds = np.full(len(corpus), np.nan)
+    upper_bounds[candidates] = matcher.combine_scores(
+        plan, components, matcher.calculate_position_scores(counts[candidates], bound), candidates
+    )
+    
+    if exhaustive:
+        totals[candidates] = score_candidates(candidates)
+        pruned = candidates[:0]
+    else:
+        pruned = maxscore_top_k(totals, candidates, upper_bounds[candidates], score_candidates, top_k)
+    
+    # Statistics stay exact without scoring every pruned row: only those whose
+    # position factor may hit the 25 cap, or whose rounded bounds straddle the
+    # high-quality threshold, are scored. The rest are linear in the similarity,
+    # and the similarities of all rows sum to the index column sums.
+    needs_score = (
+        (counts[pruned] * 5.0 + bound * 15.0 > 25.0) |
+        ((np.round(lower_bounds[pruned], 2) < HIGH_QUALITY_SCORE) & (np.round(upper_bounds[pruned], 2) >= HIGH_QUALITY_SCORE))
+    )
+    if needs_score.any():
+        totals[pruned[needs_score]] = score_candidates(pruned[needs_score])
+    linear = pruned[~needs_score]
+    
+    known = ~np.isnan(totals)
+    total_sum = (
+        totals[known].sum() +
+        lower_bounds[linear].sum() +
+        15.0 * (index.similarity_sum(terms, weights) - np.nansum(similarities))
+    )
+    statistics = {
+        "total_resumes_scanned": len(corpus),
+        "average_score": round(float(total_sum) / len(corpus), 2) if len(corpus) else 0,
+        "high_quality_matches": int(
+            (np.round(totals[known], 2) >= HIGH_QUALITY_SCORE).sum() +
+            (np.round(lower_bounds[linear], 2) >= HIGH_QUALITY_SCORE).sum()
+        ),
+        "top_matches_count": min(top_k, len(corpus))
+    }
+    
+    def complete() -> np.ndarray:
+        rest = np.flatnonzero(np.isnan(totals))
+        if len(rest):
+            totals[rest] = score_candidates(rest)
+        return totals
+    
+    def materialize(index: int) -> Dict[str, Any]:
+        return matcher.calculate_match_score(corpus.rows[index], plan, position_similarity=float(similarities[index]))
+    
+    return RankedResults(totals, materialize, k=top_k, statistics=statistics, complete=complete)
+
+async def enrich_matches(matches: List[Dict[str, Any]], payload: MatchJobRequest) -> List[Dict[str, Any]]:
+    """
+    Attach profile-page details ("profile", None if unavailable) to the first
+    payload.enrich_top matches; copies are returned, stored rankings stay as they are
+    """
+    head = matches[:payload.enrich_top]
+    profiles = await profile_enricher.enrich(
+        [
+            (
+                match["resume_data"].get("id") or "",
+                match["resume_data"].get("updated") or "",
+                match["resume_data"].get("profile_url") or ""
+            )
+            for match in head
+        ],
+        phpsessid=payload.cookies.phpsessid,
+        guest_id=payload.cookies.guest_id,
+        fcnec=payload.cookies.fcnec
+    )
+    return [dict(match, profile=profiles.get(match["resume_data"].get("id"))) for match in head] + matches[len(head):]
+
+def score_resume_rows(rows: List[Dict[str, str]], plan: MatchPlan) -> List[Dict[str, Any]]:
+    """Score a batch of corpus rows, sharing one TF-IDF fit across the batch"""
+    similarities = matcher.calculate_position_similarities(rows, plan.query)
+    results: List[Dict[str, Any]] = []
+    
+    for row, similarity in zip(rows, similarities):
+        try:
+            results.append(matcher.calculate_match_score(
+                resume_data=row,
+                plan=plan,
+                position_similarity=similarity
+            ))
+        except Exception as e:
+            logger.warning(f"Error matching resume {row.get('เรซูเม่ ID')}: {e}")
+            continue
+    
+    return results
 
 @router.post("/match-job", response_model=Dict[str, Any])
 async def match_job_endpoint(payload: MatchJobRequest):
@@ -426,19 +839,23 @@ async def match_job_endpoint(payload: MatchJobRequest):
         raise HTTPException(status_code=400, detail="Job description is required")
     
     logger.info("Starting enhanced job matching process...")
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
     
-    # Step 1: Scrape JobThai resumes
+    # Step 1: Get the latest JobThai snapshot (scrapes only when missing or too stale)
     try:
-        from controllers.jobthai_scraper import scrape_jobthai_resumes
-        
-        logger.info("Scraping JobThai resumes...")
-        csv_path = scrape_jobthai_resumes(
+        snapshot = await corpus_refresher.get_snapshot(
             phpsessid=payload.cookies.phpsessid,
             guest_id=payload.cookies.guest_id,
             fcnec=payload.cookies.fcnec,
-            max_pages=10
+            max_pages=payload.max_pages,
+            max_age=payload.max_snapshot_age,
+            queries=search_queries(payload)
         )
-        logger.info(f"CSV saved to: {csv_path}")
+        # Pin this version: later refreshes write new files and never touch this one
+        csv_path = snapshot.csv_path
+        timings["corpus_seconds"] = time.perf_counter() - started
+        logger.info(f"Using corpus snapshot {snapshot.version} ({snapshot.age_seconds():.0f}s old)")
         
     except Exception as e:
         logger.error(f"Scraping failed: {str(e)}")
@@ -451,47 +868,58 @@ async def match_job_endpoint(payload: MatchJobRequest):
     if not os.path.exists(csv_path):
         raise HTTPException(status_code=500, detail="CSV file not found after scraping")
     
-    matched_resumes: List[Dict[str, Any]] = []
-    
     try:
-        with open(csv_path, 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            
-            for row in reader:
-                try:
-                    match_result = matcher.calculate_match_score(
-                        resume_data=row,
-                        analysis=payload.analysis,
-                        job_description=payload.job_description
-                    )
-                    matched_resumes.append(match_result)
-                    
-                except Exception as e:
-                    logger.warning(f"Error matching resume {row.get('เรซูเม่ ID')}: {e}")
-                    continue
+        cache_corpus = corpus_refresher.config_key(payload.max_pages, search_queries(payload))
+        if payload.filters is not None:
+            corpus_source = "store"
+            cache_corpus = f"{cache_corpus}+filtered"
+            cache_version = await run_in_threadpool(filtered_cache_version, snapshot.version)
+        else:
+            corpus_source = "snapshot"
+            cache_version = snapshot.version
+        cache_key = ranking_cache_key(payload)
         
-        # Sort by score (descending)
-        matched_resumes.sort(key=lambda x: x['total_score'], reverse=True)
+        # Same job description and analysis against the same corpus version: reuse the ranking
+        ranking = ranking_cache.get(cache_corpus, cache_version, cache_key)
+        cached = ranking is not None
+        started = time.perf_counter()
         
-        # Get top 20 matches
-        top_matches = matched_resumes[:20]
+        if ranking is None:
+            if payload.filters is not None:
+                # Push hard filters into SQLite so only the pinned snapshot's eligible resumes are scored
+                resume_ids = await run_in_threadpool(snapshot_resume_ids, csv_path)
+                rows = await run_in_threadpool(filtered_rows, payload.filters, resume_ids)
+                corpus = await run_in_threadpool(ResumeCorpus.from_rows, rows, matcher)
+            else:
+                corpus = await run_in_threadpool(load_corpus, csv_path)
+            plan = await run_in_threadpool(prepare_plan, payload)
+            ranking = await run_in_threadpool(rank_corpus, corpus, plan, payload.top_k)
+            ranking_cache.put(cache_corpus, cache_version, cache_key, ranking)
         
-        # Calculate statistics
-        avg_score = sum(r['total_score'] for r in matched_resumes) / len(matched_resumes) if matched_resumes else 0
-        high_quality_count = sum(1 for r in matched_resumes if r['total_score'] >= 75)
+        # Top-k matches and statistics come from one bounded pass; the full
+        # ranking stays available for paginated browsing
+        top_matches = ranking.top()
+        result_id = match_results.save(ranking)
+        timings["ranking_seconds"] = time.perf_counter() - started
+        if payload.enrich_top:
+            started = time.perf_counter()
+            top_matches = await enrich_matches(top_matches, payload)
+            timings["enrich_seconds"] = time.perf_counter() - started
+        metrics_log.record_match("match-job", timings)
         
-        logger.info(f"Matched {len(matched_resumes)} resumes, returning top {len(top_matches)}")
+        logger.info(f"Matched {len(ranking)} resumes{' (cached)' if cached else ''}, returning top {len(top_matches)}")
         
         return {
             "status": "success",
-            "statistics": {
-                "total_resumes_scanned": len(matched_resumes),
-                "average_score": round(avg_score, 2),
-                "high_quality_matches": high_quality_count,
-                "top_matches_count": len(top_matches)
-            },
+            "statistics": ranking.statistics,
             "top_matches": top_matches,
+            "result_id": result_id,
+            "next_cursor": encode_cursor(result_id, len(top_matches)) if len(ranking) > len(top_matches) else None,
             "csv_file": csv_path,
+            "snapshot": snapshot.to_dict(),
+            "corpus_source": corpus_source,
+            "cached": cached,
+            "timings": {stage: round(seconds, 3) for stage, seconds in timings.items()},
             "job_description": payload.job_description,
             "matching_algorithm": "Enhanced NLP-based matching with multi-factor analysis"
         }
@@ -503,6 +931,253 @@ async def match_job_endpoint(payload: MatchJobRequest):
             detail=f"Failed to process CSV: {str(e)}"
         )
 
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event frame"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/match-job/stream")
+async def match_job_stream_endpoint(payload: MatchJobRequest):
+    """
+    Streaming variant of /match-job using Server-Sent Events
+    Emits "progress" after each scraped page, "leaderboard" with the current
+    top matches once that page is scored, then "done" with the final statistics
+    (or "error" if any stage fails). A snapshot fresh enough for
+    max_snapshot_age is scored in page-sized chunks instead of re-scraping.
+    With filters, each page's resumes go through the same SQLite query as
+    /match-job (scraped pages are upserted first), and only eligible ones are
+    scored and ranked.
+    """
+    if not payload.job_description.strip():
+        raise HTTPException(status_code=400, detail="Job description is required")
+    
+    key = corpus_refresher.register(
+        phpsessid=payload.cookies.phpsessid,
+        guest_id=payload.cookies.guest_id,
+        fcnec=payload.cookies.fcnec,
+        max_pages=payload.max_pages,
+        queries=search_queries(payload)
+    )
+    snapshot = corpus_refresher.latest(key)
+    if snapshot is not None and payload.max_snapshot_age is not None and snapshot.age_seconds() > payload.max_snapshot_age:
+        snapshot = None
+    
+    def iter_snapshot_pages(csv_path: str, page_size: int = STREAM_PAGE_SIZE):
+        with open(csv_path, 'r', encoding='utf-8-sig') as f:
+            page, rows = 1, []
+            for row in csv.DictReader(f):
+                rows.append(row)
+                if len(rows) == page_size:
+                    yield None, page, rows
+                    page, rows = page + 1, []
+            if rows:
+                yield None, page, rows
+    
+    async def iter_scraped_pages(failed_pages: Dict[SearchQuery, Dict[int, str]], scrape_metrics: ScrapeMetrics):
+        """Pages of every search, with resumes already seen under another search dropped"""
+        seen: Set[str] = set()
+        async for query, page, rows in aiter_search_pages(
+            phpsessid=payload.cookies.phpsessid,
+            guest_id=payload.cookies.guest_id,
+            fcnec=payload.cookies.fcnec,
+            queries=list(dict.fromkeys(search_queries(payload) or [DEFAULT_SEARCH])),
+            max_pages=payload.max_pages,
+            failures=failed_pages,
+            page_cache=corpus_refresher.page_cache,
+            metrics=scrape_metrics
+        ):
+            unseen = [row for row in rows if row["เรซูเม่ ID"] not in seen]
+            scrape_metrics.rows_duplicate += len(rows) - len(unseen)
+            rows = unseen
+            seen.update(row["เรซูเม่ ID"] for row in rows)
+            if rows:
+                yield query.key(), page, rows
+    
+    async def event_stream():
+        failed_pages: Dict[SearchQuery, Dict[int, str]] = {}
+        scrape_metrics = ScrapeMetrics(keep_pages=False)
+        if snapshot is not None:
+            source = "snapshot"
+            pages = iterate_in_threadpool(iter_snapshot_pages(snapshot.csv_path))
+        else:
+            source = "scrape"
+            pages = iter_scraped_pages(failed_pages, scrape_metrics)
+        # Seconds waiting for pages (scrape or snapshot read) vs scoring them
+        timings = {"corpus_seconds": 0.0, "scoring_seconds": 0.0}
+        started = time.perf_counter()
+        
+        leaderboard = TopKSelector(payload.top_k)
+        corpus_rows: List[Dict[str, str]] = []
+        # Rows that pass payload.filters (only collected when filtering)
+        eligible_rows: List[Dict[str, str]] = []
+        
+        try:
+            # Segmentation, TF-IDF and token-cache I/O run in the threadpool, off the event loop
+            plan = await run_in_threadpool(prepare_plan, payload)
+        except Exception as e:
+            logger.error(f"Streaming match failed: {str(e)}")
+            yield _sse_event("error", {"detail": f"Failed to process job description: {str(e)}"})
+            return
+        
+        try:
+            async for search, page, rows in pages:
+                corpus_rows.extend(rows)
+                yield _sse_event("progress", {
+                    "source": source,
+                    "search": search,
+                    "page": page,
+                    "max_pages": payload.max_pages,
+                    "rows": len(rows)
+                })
+                
+                if payload.filters is not None:
+                    if source == "scrape":
+                        await run_in_threadpool(corpus_refresher.corpus_store.upsert_rows, rows)
+                    rows = await run_in_threadpool(
+                        filtered_rows, payload.filters, [row["เรซูเม่ ID"] for row in rows]
+                    )
+                    eligible_rows.extend(rows)
+                
+                # Progressive scores fit TF-IDF per page; the final ranking is rescored corpus-wide
+                scoring_started = time.perf_counter()
+                for match_result in await run_in_threadpool(score_resume_rows, rows, plan):
+                    leaderboard.push(match_result['total_score'], match_result)
+                timings["scoring_seconds"] += time.perf_counter() - scoring_started
+                
+                yield _sse_event("leaderboard", {
+                    "page": page,
+                    "total_resumes_scanned": leaderboard.count,
+                    "statistics": leaderboard.statistics(),
+                    "top_matches": leaderboard.results()
+                })
+        
+        except Exception as e:
+            logger.error(f"Streaming match failed: {str(e)}")
+            yield _sse_event("error", {"detail": f"Failed to scrape JobThai: {str(e)}"})
+            return
+        
+        timings["corpus_seconds"] = time.perf_counter() - started - timings["scoring_seconds"]
+        if source == "scrape":
+            scrape_metrics.finish(len(corpus_rows))
+            metrics_log.record_scrape(key, scrape_metrics)
+            if not corpus_rows:
+                yield _sse_event("error", {"detail": "Failed to scrape JobThai: No data scraped from JobThai"})
+                return
+        
+        try:
+            if source == "scrape":
+                published = await run_in_threadpool(
+                    corpus_refresher.publish, key, corpus_rows,
+                    {query.key(): sorted(failures) for query, failures in failed_pages.items() if failures},
+                    payload.filters is not None
+                )
+                csv_path = published.csv_path
+                snapshot_info = published.to_dict()
+            else:
+                csv_path = snapshot.csv_path
+                snapshot_info = snapshot.to_dict()
+            
+            # Final ranking with one TF-IDF fit over the whole corpus, same as /match-job
+            started = time.perf_counter()
+            if payload.filters is not None:
+                corpus = await run_in_threadpool(ResumeCorpus.from_rows, eligible_rows, matcher)
+            elif source == "snapshot":
+                corpus = await run_in_threadpool(load_corpus, csv_path)
+            else:
+                corpus = await run_in_threadpool(ResumeCorpus.from_rows, corpus_rows, matcher)
+            ranking = await run_in_threadpool(rank_corpus, corpus, plan, payload.top_k)
+            if payload.filters is not None:
+                cache_version = await run_in_threadpool(filtered_cache_version, snapshot_info["version"])
+                ranking_cache.put(f"{key}+filtered", cache_version, ranking_cache_key(payload), ranking)
+            else:
+                ranking_cache.put(key, snapshot_info["version"], ranking_cache_key(payload), ranking)
+            top_matches = ranking.top()
+            result_id = match_results.save(ranking)
+            timings["ranking_seconds"] = time.perf_counter() - started
+            if payload.enrich_top:
+                started = time.perf_counter()
+                top_matches = await enrich_matches(top_matches, payload)
+                timings["enrich_seconds"] = time.perf_counter() - started
+            metrics_log.record_match("match-job/stream", timings)
+        
+        except Exception as e:
+            logger.error(f"Streaming match failed: {str(e)}")
+            yield _sse_event("error", {"detail": f"Failed to process CSV: {str(e)}"})
+            return
+        
+        yield _sse_event("done", {
+            "status": "success",
+            "statistics": ranking.statistics,
+            "top_matches": top_matches,
+            "result_id": result_id,
+            "next_cursor": encode_cursor(result_id, len(top_matches)) if len(ranking) > len(top_matches) else None,
+            "csv_file": csv_path,
+            "snapshot": snapshot_info,
+            "scrape_metrics": scrape_metrics.totals() if source == "scrape" else None,
+            "timings": {stage: round(seconds, 3) for stage, seconds in timings.items()},
+            "job_description": payload.job_description,
+            "matching_algorithm": "Enhanced NLP-based matching with multi-factor analysis"
+        })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Recent scrape totals (fetch time, bytes, parse time, rows) and match
+    timings (corpus, scoring, ranking, enrichment), newest first, and whether
+    JobThai requests are currently held back by the circuit breaker
+    """
+    return {**metrics_log.snapshot(), "jobthai_circuit_open": jobthai_circuit_breaker.is_open}
+
+def ranking_page(ranking: Sequence[Dict[str, Any]], offset: int, limit: int, projection: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Ranked, projected results offset to offset + limit of a stored ranking"""
+    return [
+        {"rank": offset + i + 1, **project_result(result, projection)}
+        for i, result in enumerate(ranking[offset:offset + limit])
+    ]
+
+@router.get("/match-results/{result_id}")
+async def get_match_results(
+    result_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = None
+):
+    """
+    Page through a stored match ranking
+    cursor comes from a previous response's next_cursor (omit for the first page);
+    fields is a comma-separated projection such as "total_score,breakdown,resume_data.id"
+    """
+    ranking = match_results.get(result_id)
+    if ranking is None:
+        raise HTTPException(status_code=404, detail="Match result not found or expired")
+    
+    offset = 0
+    if cursor:
+        try:
+            cursor_result_id, offset = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if cursor_result_id != result_id:
+            raise HTTPException(status_code=400, detail="Cursor does not belong to this result")
+    
+    # The first page past the top-k scores pruned rows and sorts the whole
+    # ranking, and every page builds result payloads: keep that off the event loop
+    items = await run_in_threadpool(ranking_page, ranking, offset, limit, parse_fields(fields))
+    next_offset = offset + len(items)
+    
+    return {
+        "result_id": result_id,
+        "total": len(ranking),
+        "offset": offset,
+        "items": items,
+        "next_cursor": encode_cursor(result_id, next_offset) if next_offset < len(ranking) else None
+    }
+
 @router.post("/upload-resumes")
 async def upload_resumes(files: List[UploadFile] = File(...)):
     """Upload multiple resume files"""
@@ -513,6 +1188,7 @@ async def upload_resumes(files: List[UploadFile] = File(...)):
     os.makedirs(data_dir, exist_ok=True)
     
     uploaded = []
+    checksums = {}
     errors = []
     
     for file in files:
@@ -527,19 +1203,18 @@ async def upload_resumes(files: List[UploadFile] = File(...)):
             
         try:
             file_path = os.path.join(data_dir, file.filename)
-            content = await file.read()
-            
-            with open(file_path, 'wb') as f:
-                f.write(content)
+            file_size, file_sha256 = await stream_upload_to_path(file, file_path, max_size=MAX_UPLOAD_SIZE)
                 
             uploaded.append(file.filename)
-            logger.info(f"Uploaded: {file.filename}")
+            checksums[file.filename] = file_sha256
+            logger.info(f"Uploaded: {file.filename} ({file_size} bytes, sha256: {file_sha256})")
             
         except Exception as e:
             errors.append(f"Error uploading {file.filename}: {str(e)}")
     
     return {
         'uploaded': uploaded,
+        'checksums': checksums,
         'errors': errors,
         'total_uploaded': len(uploaded)
     }
@@ -0,0 +1,73 @@
+import csv
+import os
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from controllers.resume_corpus import ResumeCorpus
+from routers.match_job import matcher
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "jobthai_resumes.csv")
+
+JOB_DESCRIPTIONS = [
+    "รับสมัคร Developer Python PHP SQL เงินเดือน 25,000 บาท ประสบการณ์ 2 ปี กรุงเทพ",
+    # Terms no resume contains must still count towards the job vector's norm
+    "Programmer Java บัญชี การตลาด kubernetes terraform zzzunknownword",
+]
+
+
+@pytest.fixture(scope="module")
+def rows():
+    with open(CSV_PATH, "r", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.fixture(scope="module")
+def corpus(rows):
+    return ResumeCorpus.from_rows(rows, matcher)
+
+
+def index_similarities(corpus, query):
+    index = corpus.index
+    terms, weights = index.query_terms(list(query.tokens))
+    postings = index.query_postings(terms)
+    candidates = index.candidates(postings)
+    similarities = np.zeros(len(corpus))
+    similarities[candidates] = index.similarities(postings, weights, candidates)
+    return similarities
+
+
+def position_docs(rows):
+    return matcher.token_cache.tokenize_many([
+        f"{row.get('ตำแหน่งที่สมัคร', '')} {row.get('ตำแหน่งที่เคยทำ', '')}".lower()
+        for row in rows
+    ])
+
+
+def batch_similarities(rows, job_doc):
+    """Cosines of full TF-IDF vectors under the corpus IDF; job terms in no resume get document frequency 0"""
+    docs = position_docs(rows)
+    analyzer = matcher.make_position_vectorizer().build_analyzer()
+    vectorizer = matcher.make_position_vectorizer()
+    vectorizer.set_params(vocabulary=sorted(set().union(*map(analyzer, docs), analyzer(job_doc))))
+    matrix = vectorizer.fit_transform(docs)
+    return (matrix @ vectorizer.transform([job_doc]).T).toarray().ravel()
+
+
+@pytest.mark.parametrize("job_description", JOB_DESCRIPTIONS)
+def test_index_scores_equal_batch_cosine_scores(rows, corpus, job_description):
+    query = matcher.compile_job_query(job_description)
+    expected = batch_similarities(rows, list(query.tokens))
+
+    np.testing.assert_allclose(index_similarities(corpus, query), expected, rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize("job_description", JOB_DESCRIPTIONS)
+def test_index_scores_track_per_request_fit(rows, corpus, job_description):
+    # calculate_position_similarities also counts the job document in the IDF,
+    # so it differs from the corpus-fitted index only by that one document
+    query = matcher.compile_job_query(job_description)
+    expected = np.array(matcher.calculate_position_similarities(rows, query))
+
+    np.testing.assert_allclose(index_similarities(corpus, query), expected, atol=0.01)
@@ -0,0 +1,23 @@
+import numpy as np
+
+from controllers.match_results import RankedResults
+
+
+def test_top_k_keeps_row_order_among_equal_scores():
+    totals = np.array([50.0, 80.0, np.nan, 80.0, 50.0, 90.0, 50.0])
+    ranking = RankedResults(totals, lambda row: row, k=4)
+
+    assert ranking.top() == [5, 1, 3, 0]
+    assert ranking.statistics == {
+        "total_resumes_scanned": 6,
+        "average_score": 66.67,
+        "high_quality_matches": 3,
+        "top_matches_count": 4
+    }
+
+
+def test_paging_past_k_continues_the_same_order():
+    totals = np.array([10.0, 30.0, 20.0, 30.0, 10.0])
+    ranking = RankedResults(totals, lambda row: row, k=2, complete=lambda: totals)
+
+    assert ranking[:] == [1, 3, 2, 0, 4]
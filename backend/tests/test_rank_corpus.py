@@ -0,0 +1,38 @@
+import csv
+import os
+
+import pytest
+
+from controllers.resume_corpus import ResumeCorpus
+from routers.match_job import matcher, rank_corpus
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "jobthai_resumes.csv")
+
+ANALYSIS = {"analysis": {"skills": {"programming": ["Python", "PHP", "SQL"], "web": ["HTML", "React"]}}}
+
+JOB_DESCRIPTIONS = [
+    "รับสมัคร Developer Python PHP SQL เงินเดือน 25,000 บาท ประสบการณ์ 2 ปี กรุงเทพ",
+    "Programmer Java บัญชี การตลาด เงินเดือน 18,000 บาท ปริญญาตรี ชลบุรี",
+    "พนักงานขาย ประสบการณ์ 5 ปี",
+]
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    # Repeated rows make equal scores common and leave candidates to prune
+    with open(CSV_PATH, "r", encoding="utf-8-sig") as f:
+        return ResumeCorpus.from_rows(list(csv.DictReader(f)) * 5, matcher)
+
+
+@pytest.mark.parametrize("top_k", [1, 5, 20])
+@pytest.mark.parametrize("job_description", JOB_DESCRIPTIONS)
+def test_pruned_ranking_equals_exhaustive(corpus, job_description, top_k):
+    plan = matcher.prepare_match(ANALYSIS, matcher.compile_job_query(job_description))
+    pruned = rank_corpus(corpus, plan, top_k=top_k)
+    exhaustive = rank_corpus(corpus, plan, top_k=top_k, exhaustive=True)
+
+    assert [match["resume_data"] for match in pruned.top()] == [match["resume_data"] for match in exhaustive.top()]
+    assert [match["total_score"] for match in pruned.top()] == [match["total_score"] for match in exhaustive.top()]
+    assert pruned.statistics == exhaustive.statistics
+    # Paging past k scores the pruned rows and continues in the exhaustive order
+    assert pruned[top_k:top_k + 10] == exhaustive[top_k:top_k + 10]